@@ -15,6 +15,52 @@ Because multiple tasks may request the value simultaneously and get the same res
 the threshold must be above 0 to prevent the API from shutting down with a 420 error.
 """
 
+APPUTILS_ESI_CIRCUIT_BREAKER_THRESHOLD = clean_setting(
+    "APPUTILS_ESI_CIRCUIT_BREAKER_THRESHOLD", 3, min_value=1
+)
+"""Number of consecutive failed ESI status requests,
+after which no more requests are made for a cooldown period.
+"""
+
+APPUTILS_ESI_CIRCUIT_BREAKER_COOLDOWN = clean_setting(
+    "APPUTILS_ESI_CIRCUIT_BREAKER_COOLDOWN", 60
+)
+"""Seconds without requests to the ESI status after the threshold was reached.
+
+After the cooldown a single request is made to probe whether ESI is back online.
+"""
+
+APPUTILS_ESI_DAILY_DOWNTIMES = clean_setting(
+    "APPUTILS_ESI_DAILY_DOWNTIMES", None, required_type=list
+)
+"""Daily downtimes of ESI as list of start and end times in UTC hours,
+e.g. ``[(11.0, 11.25), (23.5, 0.5)]``.
+
+Downtimes may wrap past midnight.
+When defined replaces the downtime from ``APPUTILS_ESI_DOWNTIME_START``
+and ``APPUTILS_ESI_DOWNTIME_END``.
+"""
+
+APPUTILS_ESI_ERROR_BUDGET_THRESHOLD = clean_setting(
+    "APPUTILS_ESI_ERROR_BUDGET_THRESHOLD", 5
+)
+"""Number of remaining errors, which the shared ESI error budget never hands out.
+
+Reservations from the error budget are counted atomically by all processes,
+so this threshold can be much lower than ``APPUTILS_ESI_ERROR_LIMIT_THRESHOLD``.
+"""
+
+APPUTILS_ESI_STATUS_CACHE_TIMEOUT = clean_setting(
+    "APPUTILS_ESI_STATUS_CACHE_TIMEOUT", 30
+)
+"""Max age in seconds of the shared ESI status before it is fetched again.
+
+Only applies to esi.fetch_esi_status_cached().
+"""
+
+APPUTILS_ESI_HTTP_POOL_MAXSIZE = clean_setting("APPUTILS_ESI_HTTP_POOL_MAXSIZE", 10)
+"""Max number of connections to ESI kept open for re-use per process."""
+
 APPUTILS_ESI_DAILY_DOWNTIME_START = clean_setting("APPUTILS_ESI_DOWNTIME_START", 11.0)
 """Start time of daily downtime in UTC hours.
 
@@ -26,3 +72,68 @@ APPUTILS_ESI_DAILY_DOWNTIME_END = clean_setting("APPUTILS_ESI_DOWNTIME_END", 11.
 
 esi.fetch_esi_status() will report ESI as offline during this time.
 """
+
+APPUTILS_ESI_OFFLINE_RETRY_DELAY = clean_setting(
+    "APPUTILS_ESI_OFFLINE_RETRY_DELAY", 600
+)
+"""Delay in seconds before tasks are retried when ESI is offline
+outside of the daily downtime.
+
+Only applies to esi.retry_task_if_esi_is_down().
+"""
+
+APPUTILS_ESI_RETRY_RAMP_DURATION = clean_setting(
+    "APPUTILS_ESI_RETRY_RAMP_DURATION", 120
+)
+"""Duration in seconds over which the release of retried tasks ramps up
+to the full release rate once ESI is expected to be online again.
+
+Only applies to esi.retry_task_if_esi_is_down().
+"""
+
+APPUTILS_ESI_RETRY_RELEASE_RATE = clean_setting(
+    "APPUTILS_ESI_RETRY_RELEASE_RATE", 5, min_value=1
+)
+"""Max number of retried tasks released per second
+once ESI is expected to be online again.
+
+Only applies to esi.retry_task_if_esi_is_down().
+"""
+
+APP_UTILS_CACHE_STAMPEDE_LOCK_TIMEOUT = clean_setting(
+    "APP_UTILS_CACHE_STAMPEDE_LOCK_TIMEOUT", 10
+)
+"""Max time in seconds a process can hold the lock for recomputing a cache entry.
+
+Only applies to caching with stampede protection enabled.
+"""
+
+APP_UTILS_CACHE_STAMPEDE_WAIT_TIMEOUT = clean_setting(
+    "APP_UTILS_CACHE_STAMPEDE_WAIT_TIMEOUT", 2.0
+)
+"""Max time in seconds to wait for another process to recompute a missing entry.
+
+When this time is exceeded the waiting process will recompute the entry itself.
+Only applies to caching with stampede protection enabled.
+"""
+
+APP_UTILS_CACHE_STAMPEDE_GRACE_PERIOD = clean_setting(
+    "APP_UTILS_CACHE_STAMPEDE_GRACE_PERIOD", 60
+)
+"""Time in seconds an expired entry is kept to be served while it is recomputed.
+
+Only applies to caching with stampede protection enabled.
+"""
+
+APP_UTILS_CACHE_STAMPEDE_BETA = clean_setting("APP_UTILS_CACHE_STAMPEDE_BETA", 1.0)
+"""Factor for the probabilistic early refresh of cache entries.
+
+Values above 1.0 favor earlier refreshes, values below 1.0 favor later refreshes.
+Only applies to caching with stampede protection enabled.
+"""
+
+APP_UTILS_METRICS_SINK = clean_setting("APP_UTILS_METRICS_SINK", "")
+"""Import path of a metrics sink class for collecting metrics about caching.
+
+e.g. ``"app_utils.metrics.LoggingSink"``. Metrics are disabled when not set.
+"""
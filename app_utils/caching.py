@@ -1,19 +1,322 @@
+import asyncio
+import datetime as dt
 import functools
 import hashlib
-from typing import Union
+import math
+import pickle
+import random
+import threading
+import zlib
+from collections import Counter, OrderedDict, namedtuple
+from decimal import Decimal
+from enum import Enum
+from time import monotonic, perf_counter, sleep, time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Type, Union
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
 
 from django.core.cache import cache
-from django.db import models
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+
+from . import metrics
+from ._app_settings import (
+    APP_UTILS_CACHE_STAMPEDE_BETA,
+    APP_UTILS_CACHE_STAMPEDE_GRACE_PERIOD,
+    APP_UTILS_CACHE_STAMPEDE_LOCK_TIMEOUT,
+    APP_UTILS_CACHE_STAMPEDE_WAIT_TIMEOUT,
+)
+
+# Timeout for generations of objects in seconds. A lost generation only causes misses.
+OBJECT_GENERATION_TIMEOUT = 24 * 3600
+
+
+class LocalCache:
+    """Bounded in-process LRU cache with a timeout per entry.
+
+    Entries are stored in the memory of the current process only
+    and the least recently used entries are evicted when a size limit is reached.
+    Values are returned as they were stored, so all callers share the same object.
+    Mutable values must therefore be treated as read-only.
+
+    Args:
+        max_entries: Max number of entries
+        max_bytes: Max total size of all entries in bytes (if any), \
+            measured as size of the pickled values
+        timeout: Default timeout for entries in seconds
+
+    Example:
+
+    .. code-block:: python
+
+        local_cache = LocalCache(max_entries=1000, timeout=30)
+        local_cache.set("my_key", "my_value")
+        value = local_cache.get("my_key")
+
+    """
+
+    def __init__(
+        self, max_entries: int = 1000, max_bytes: int = None, timeout: float = 60
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self.timeout = timeout
+        self._entries = OrderedDict()  # key -> (value, expires_at, size, group)
+        self._groups = {}  # group -> set of keys
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self._stats = Counter()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, default=None) -> Any:
+        """Return value for key or default if not found or expired."""
+        with self._lock:
+            try:
+                value, expires_at, _, _ = self._entries[key]
+            except KeyError:
+                self._stats["misses"] += 1
+                return default
+            if expires_at <= monotonic():
+                self._remove(key)
+                self._stats["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, key: str, value, timeout: float = None, group: str = None) -> None:
+        """Store value for key.
+
+        Args:
+            key: Key for the value
+            value: Value to store
+            timeout: Timeout in seconds. Will use default timeout if not provided.
+            group: Optional group, which allows deleting many entries at once \
+                with :meth:`delete_group`
+        """
+        if timeout is None:
+            timeout = self.timeout
+        size = (
+            len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL)) if self.max_bytes else 0
+        )
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes and size > self.max_bytes:
+                return
+            self._entries[key] = (value, monotonic() + timeout, size, group)
+            self._total_bytes += size
+            if group is not None:
+                self._groups.setdefault(group, set()).add(key)
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes and self._total_bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def delete(self, key: str) -> None:
+        """Delete entry for key if it exists."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def delete_group(self, group: str) -> None:
+        """Delete all entries of a group."""
+        with self._lock:
+            for key in list(self._groups.get(group, [])):
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Delete all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return statistics about this cache.
+
+        The statistics are:
+
+        - ``hits``: Requests that found a valid entry
+        - ``misses``: Requests that found no entry or an expired entry
+        - ``evictions``: Entries removed because a size limit was reached
+        - ``entries``: Current number of entries
+        - ``bytes``: Current total size of all entries (only when max_bytes is set)
+        """
+        with self._lock:
+            return {
+                "hits": self._stats["hits"],
+                "misses": self._stats["misses"],
+                "evictions": self._stats["evictions"],
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+            }
+
+    def reset_stats(self) -> None:
+        """Reset statistics counters to zero."""
+        with self._lock:
+            self._stats.clear()
+
+    def _remove(self, key: str) -> None:
+        _, _, size, group = self._entries.pop(key)
+        self._total_bytes -= size
+        if group is not None:
+            keys = self._groups[group]
+            keys.discard(key)
+            if not keys:
+                del self._groups[group]
+
+
+class CacheSerializer:
+    """Base class for serializers of objects cached by :class:`ObjectCacheMixin`.
+
+    Without a serializer model instances are stored in the cache as they are,
+    i.e. pickled by the cache backend.
+    """
+
+    def dumps(self, obj: models.Model) -> Any:
+        """Convert a model instance into a payload for the cache."""
+        raise NotImplementedError()
+
+    def loads(
+        self, model: Type[models.Model], data: Any, db: str
+    ) -> Optional[models.Model]:
+        """Rebuild a model instance from a payload.
+
+        Returns None when the payload is outdated, e.g. after a migration.
+        The object is then treated as missing in the cache.
+        """
+        raise NotImplementedError()
+
+
+class FieldValuesSerializer(CacheSerializer):
+    """Stores only the values of the concrete fields as tuple.
+
+    Instances are rebuilt with ``Model.from_db()``.
+    Related objects loaded with ``select_related`` are stored the same way.
+
+    Payloads include a hash of the field names,
+    so payloads stored before the fields of a model changed are treated as missing.
+    """
+
+    def dumps(self, obj: models.Model) -> tuple:
+        fields = obj._meta.concrete_fields
+        values = tuple(getattr(obj, field.attname) for field in fields)
+        related = []
+        for field in fields:
+            if field.is_relation and field.is_cached(obj):
+                rel_obj = field.get_cached_value(obj)
+                rel_data = self.dumps(rel_obj) if rel_obj is not None else None
+                related.append((field.name, rel_data))
+        return _fields_hash(type(obj)), values, tuple(related)
+
+    def loads(
+        self, model: Type[models.Model], data: tuple, db: str
+    ) -> Optional[models.Model]:
+        if len(data) != 3 or data[0] != _fields_hash(model):
+            return None
+        _, values, related = data
+        field_names = [field.attname for field in model._meta.concrete_fields]
+        obj = model.from_db(db, field_names, values)
+        for name, rel_data in related:
+            field = model._meta.get_field(name)
+            if rel_data is None:
+                rel_obj = None
+            else:
+                rel_obj = self.loads(field.related_model, rel_data, db)
+                if rel_obj is None:
+                    return None
+            field.set_cached_value(obj, rel_obj)
+        return obj
+
+
+@functools.lru_cache(maxsize=None)
+def _fields_hash(model: Type[models.Model]) -> int:
+    """Return a hash of the names of all concrete fields of a model."""
+    attnames = ",".join(field.attname for field in model._meta.concrete_fields)
+    return zlib.crc32(attnames.encode("utf-8"))
+
+
+class CompressedFieldValuesSerializer(FieldValuesSerializer):
+    """Stores the values of the concrete fields as compressed bytes.
+
+    Args:
+        level: compression level for zlib from 1 (fastest) to 9 (smallest)
+    """
+
+    def __init__(self, level: int = 6) -> None:
+        self.level = level
+
+    def dumps(self, obj: models.Model) -> bytes:
+        data = pickle.dumps(super().dumps(obj), pickle.HIGHEST_PROTOCOL)
+        return zlib.compress(data, self.level)
+
+    def loads(
+        self, model: Type[models.Model], data: bytes, db: str
+    ) -> Optional[models.Model]:
+        return super().loads(model, pickle.loads(zlib.decompress(data)), db)
 
 
 class ObjectCacheMixin:
-    """Adds a simple object cache to a Django manager"""
+    """Adds a simple object cache to a Django manager
+
+    Cached objects incl. all their ``select_related`` variants are invalidated
+    automatically when an object is saved or deleted.
+    Every save or delete thereby costs two requests to the cache
+    and two more after the transaction is committed.
+    Note that this does not apply to changes which do not send
+    the ``post_save`` and ``post_delete`` signals, e.g. ``QuerySet.update()``.
+    Automatic invalidation can be disabled by setting ``cache_invalidation`` to False.
+
+    Objects can optionally also be cached in a :class:`LocalCache`
+    in front of the Django cache by defining it as ``local_cache``.
+    Entries of the local cache are invalidated when an object is saved or deleted
+    in the current process. In other processes they are served
+    until they time out, so keep the timeout of the local cache short.
+    Objects are stored pickled in the local cache,
+    so every call returns a new instance, same as with the Django cache.
+
+    Objects are stored as pickled model instances by default.
+    A more compact format can be used by defining a :class:`CacheSerializer`
+    as ``cache_serializer``.
+
+    Example:
+
+    .. code-block:: python
+
+        class MyModelManager(ObjectCacheMixin, models.Manager):
+            local_cache = LocalCache(max_entries=500, timeout=30)
+            cache_serializer = FieldValuesSerializer()
+
+    """
+
+    cache_invalidation: bool = True
+    cache_serializer: Optional[CacheSerializer] = None
+    local_cache: Optional[LocalCache] = None
+
+    def contribute_to_class(self, model, name):
+        super().contribute_to_class(model, name)
+        if model._meta.abstract:
+            return
+        if self.cache_invalidation or self.local_cache is not None:
+            post_save.connect(self._on_object_changed, sender=model, weak=False)
+            post_delete.connect(self._on_object_changed, sender=model, weak=False)
+        if self.cache_invalidation:
+            register_queryset_dependency(model)
 
     def get_cached(
         self,
         pk,
         timeout: Union[int, float] = None,
         select_related: str = None,
+        stampede_protection: bool = False,
     ) -> models.Model:
         """Will return the requested object either from DB or from cache
 
@@ -21,6 +324,10 @@ class ObjectCacheMixin:
             pk: Primary key for object to fetch
             timeout: Timeout in seconds for cache
             select_related: select_related query to be applied (if any)
+            stampede_protection: When True only one process at a time \
+                will fetch an expired object from the DB \
+                and objects are refreshed before they expire. \
+                See also :func:`stampede_protection_stats`.
 
         Returns:
             model instance if found
@@ -40,12 +347,272 @@ class ObjectCacheMixin:
             obj = MyModel.objects.get_cached(pk=42, timeout=3600)
 
         """
+        key = self._create_object_cache_key(pk, select_related)
+        if self.local_cache is not None:
+            obj = self._get_local_cache(key)
+            if obj is not None:
+                self._record_many_metrics(hits=1)
+                return obj
+        return self._get_cached_from_django_cache(
+            key, pk, timeout, select_related, stampede_protection
+        )
+
+    async def aget_cached(
+        self,
+        pk,
+        timeout: Union[int, float] = None,
+        select_related: str = None,
+        stampede_protection: bool = False,
+    ) -> models.Model:
+        """Async variant of :meth:`get_cached`.
+
+        Objects found in the local cache are returned without leaving the event loop.
+        """
+        key = self._create_object_cache_key(pk, select_related)
+        if self.local_cache is not None:
+            obj = self._get_local_cache(key)
+            if obj is not None:
+                self._record_many_metrics(hits=1)
+                return obj
+        return await sync_to_async(self._get_cached_from_django_cache)(
+            key, pk, timeout, select_related, stampede_protection
+        )
+
+    def _get_cached_from_django_cache(
+        self,
+        key: str,
+        pk,
+        timeout: Union[int, float],
+        select_related: str,
+        stampede_protection: bool,
+    ) -> models.Model:
         func = functools.partial(
             self._fetch_object_for_cache, pk=pk, select_related=select_related
         )
-        return cache.get_or_set(
-            self._create_object_cache_key(pk, select_related), func, timeout
+        if self.cache_serializer is not None:
+            func = _compose(self.cache_serializer.dumps, func)
+        metrics_name = self._metrics_name()
+        func = metrics.track_calls(func, metrics_name)
+        django_key = self._create_django_cache_keys([pk], select_related)[pk]
+        if stampede_protection:
+            data = _get_or_set_protected(django_key, func, timeout)
+        else:
+            data = _unwrap_entry(cache.get_or_set(django_key, func, timeout))
+        metrics.count_hit(func, metrics_name)
+        obj = self._load_object(data)
+        if obj is None:  # payload is outdated
+            cache.delete(django_key)
+            return self._get_cached_from_django_cache(
+                key, pk, timeout, select_related, stampede_protection
+            )
+        if self.local_cache is not None:
+            self._set_local_cache(key, obj, timeout)
+        return obj
+
+    def get_many_cached(
+        self,
+        pks: Iterable,
+        timeout: Union[int, float] = None,
+        select_related: str = None,
+        raise_if_missing: bool = False,
+    ) -> Dict[Any, models.Model]:
+        """Will return the requested objects either from DB or from cache
+
+        Uses one request to the cache for all objects
+        and one DB query for all objects not yet in the cache.
+
+        Args:
+            pks: Primary keys for objects to fetch
+            timeout: Timeout in seconds for cache
+            select_related: select_related query to be applied (if any)
+            raise_if_missing: When True will raise an exception \
+                if any of the objects can not be found. Else they are omitted.
+
+        Returns:
+            dict of model instances with the requested primary keys as keys
+
+        Exceptions:
+            ``Model.DoesNotExist`` if an object can not be found \
+                and ``raise_if_missing`` is True
+
+        Example:
+
+        .. code-block:: python
+
+            objs = MyModel.objects.get_many_cached(pks=[1, 2, 3], timeout=3600)
+
+        """
+        key_to_pk = {
+            self._create_object_cache_key(pk, select_related): pk for pk in pks
+        }
+        objs = {}
+        if self.local_cache is not None:
+            for key, pk in key_to_pk.items():
+                obj = self._get_local_cache(key)
+                if obj is not None:
+                    objs[pk] = obj
+        missing_pks = [pk for pk in key_to_pk.values() if pk not in objs]
+        db_pks = []
+        if missing_pks:
+            django_keys = self._create_django_cache_keys(missing_pks, select_related)
+            new_objs = {}
+            cached_data = cache.get_many(list(django_keys.values()))
+            for pk, django_key in django_keys.items():
+                if django_key in cached_data:
+                    obj = self._load_object(_unwrap_entry(cached_data[django_key]))
+                    if obj is not None:
+                        new_objs[pk] = obj
+            db_pks = [pk for pk in missing_pks if pk not in new_objs]
+            if db_pks:
+                started = perf_counter()
+                pk_by_str = {str(pk): pk for pk in db_pks}
+                db_objs = {
+                    pk_by_str[str(obj.pk)]: obj
+                    for obj in self._fetch_objects_for_cache(db_pks, select_related)
+                }
+                if db_objs:
+                    cache.set_many(
+                        {
+                            django_keys[pk]: self._dump_object(obj)
+                            for pk, obj in db_objs.items()
+                        },
+                        timeout,
+                    )
+                new_objs.update(db_objs)
+                self._record_many_metrics(
+                    misses=len(db_pks),
+                    sets=len(db_objs),
+                    recompute=perf_counter() - started,
+                )
+            if self.local_cache is not None:
+                for pk, obj in new_objs.items():
+                    self._set_local_cache(
+                        self._create_object_cache_key(pk, select_related), obj, timeout
+                    )
+            objs.update(new_objs)
+        self._record_many_metrics(hits=len(key_to_pk) - len(db_pks))
+        if raise_if_missing and len(objs) < len(key_to_pk):
+            missing_pks = sorted(str(pk) for pk in key_to_pk.values() if pk not in objs)
+            raise self.model.DoesNotExist(
+                "{} matching query does not exist for pks: {}".format(
+                    self.model._meta.object_name, ", ".join(missing_pks)
+                )
+            )
+        return objs
+
+    async def aget_many_cached(
+        self,
+        pks: Iterable,
+        timeout: Union[int, float] = None,
+        select_related: str = None,
+        raise_if_missing: bool = False,
+    ) -> Dict[Any, models.Model]:
+        """Async variant of :meth:`get_many_cached`.
+
+        All objects are fetched in one call to a worker thread.
+        """
+        return await sync_to_async(self.get_many_cached)(
+            pks=list(pks),
+            timeout=timeout,
+            select_related=select_related,
+            raise_if_missing=raise_if_missing,
+        )
+
+    def warm_cache(
+        self,
+        timeout: Union[int, float] = None,
+        select_related: str = None,
+        queryset: models.QuerySet = None,
+        batch_size: int = 500,
+        max_rate: float = None,
+        stampede_protection: bool = False,
+    ) -> Dict[str, float]:
+        """Fill the cache with objects, so they can be fetched with :meth:`get_cached`.
+
+        Objects are fetched in batches ordered by primary key
+        and each batch is stored with one request to the cache.
+
+        Args:
+            timeout: Timeout in seconds for cache
+            select_related: select_related query to be applied (if any)
+            queryset: Objects to put in the cache. Defaults to all objects.
+            batch_size: Number of objects fetched and stored at once
+            max_rate: Max number of objects per second (if any), \
+                e.g. to reduce the load on the DB
+            stampede_protection: Set to True when objects are fetched \
+                with stampede protection, so the stored entries are used by \
+                :meth:`get_cached` and not recomputed
+
+        Returns:
+            stats with keys ``objects``, ``seconds`` and ``objects_per_second``
+
+        Example:
+
+        .. code-block:: python
+
+            MyModel.objects.warm_cache(timeout=3600, max_rate=1000)
+
+        """
+        if queryset is None:
+            queryset = self.all()
+        if select_related:
+            queryset = queryset.select_related(select_related)
+        started = monotonic()
+        count = 0
+        batch = []
+        for obj in queryset.order_by("pk").iterator(chunk_size=batch_size):
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                count += self._store_warm_cache_batch(
+                    batch, timeout, select_related, stampede_protection
+                )
+                batch = []
+                _wait_for_max_rate(started, count, max_rate)
+        if batch:
+            count += self._store_warm_cache_batch(
+                batch, timeout, select_related, stampede_protection
+            )
+        seconds = monotonic() - started
+        return {
+            "objects": count,
+            "seconds": seconds,
+            "objects_per_second": count / seconds if seconds else 0.0,
+        }
+
+    def _store_warm_cache_batch(
+        self,
+        batch: list,
+        timeout,
+        select_related: Optional[str],
+        stampede_protection: bool,
+    ) -> int:
+        django_keys = self._create_django_cache_keys(
+            [obj.pk for obj in batch], select_related
+        )
+        data = {django_keys[obj.pk]: self._dump_object(obj) for obj in batch}
+        if stampede_protection:
+            now = time()
+            for key, value in data.items():
+                data[key], cache_timeout = _create_protected_entry(
+                    value, timeout, now, delta=0
+                )
+        else:
+            cache_timeout = timeout
+        cache.set_many(data, cache_timeout)
+        metrics.incr(f"{self._metrics_name()}.sets", len(batch))
+        return len(batch)
+
+    def invalidate_cached(self, pk) -> None:
+        """Remove an object incl. all its select_related variants from the cache.
+
+        Args:
+            pk: Primary key of the object to remove
+        """
+        cache.delete_many(
+            [self._create_object_cache_key(pk), self._create_generation_cache_key(pk)]
         )
+        if self.local_cache is not None:
+            self.local_cache.delete_group(self._create_object_cache_key(pk))
 
     def _create_object_cache_key(self, pk, select_related: str = None) -> str:
         suffix = (
@@ -60,23 +627,154 @@ class ObjectCacheMixin:
             f"_{suffix}" if suffix else "",
         )
 
+    def _create_generation_cache_key(self, pk) -> str:
+        return f"{self._create_object_cache_key(pk)}_GENERATION"
+
+    def _create_django_cache_keys(
+        self, pks: list, select_related: Optional[str]
+    ) -> Dict[Any, str]:
+        """Return the keys of objects in the Django cache.
+
+        Keys of select_related variants include a generation per object,
+        so all variants of an object are invalidated by deleting its generation.
+        """
+        if not select_related:
+            return {pk: self._create_object_cache_key(pk) for pk in pks}
+        generation_keys = {pk: self._create_generation_cache_key(pk) for pk in pks}
+        generations = cache.get_many(list(generation_keys.values()))
+        missing_keys = [
+            key for key in generation_keys.values() if key not in generations
+        ]
+        if missing_keys:
+            generations.update(
+                _init_generations(missing_keys, OBJECT_GENERATION_TIMEOUT)
+            )
+        return {
+            pk: "{}_{}".format(
+                self._create_object_cache_key(pk, select_related),
+                generations[generation_key],
+            )
+            for pk, generation_key in generation_keys.items()
+        }
+
+    def _metrics_name(self) -> str:
+        return f"object.{self.model._meta.app_label}.{self.model._meta.model_name}"
+
+    def _record_many_metrics(
+        self, hits: int = 0, misses: int = 0, sets: int = 0, recompute: float = None
+    ) -> None:
+        if metrics.get_metrics_sink() is None:
+            return
+        metrics_name = self._metrics_name()
+        for event, value in (("hits", hits), ("misses", misses), ("sets", sets)):
+            if value:
+                metrics.incr(f"{metrics_name}.{event}", value)
+        if recompute is not None:
+            metrics.timing(f"{metrics_name}.recompute", recompute)
+
+    def _dump_object(self, obj: models.Model) -> Any:
+        if self.cache_serializer is None:
+            return obj
+        return self.cache_serializer.dumps(obj)
+
+    def _load_object(self, data: Any) -> Optional[models.Model]:
+        if self.cache_serializer is None or isinstance(data, models.Model):
+            return data
+        return self.cache_serializer.loads(self.model, data, self.db)
+
+    def _get_local_cache(self, key: str) -> Optional[models.Model]:
+        data = self.local_cache.get(key)
+        if data is None:
+            return None
+        return pickle.loads(data)
+
+    def _set_local_cache(self, key: str, obj, timeout: Union[int, float]) -> None:
+        local_timeout = self.local_cache.timeout
+        if timeout is not None:
+            local_timeout = min(local_timeout, timeout)
+        self.local_cache.set(
+            key,
+            pickle.dumps(obj, pickle.HIGHEST_PROTOCOL),
+            local_timeout,
+            group=self._create_object_cache_key(obj.pk),
+        )
+
+    def _on_object_changed(self, sender, instance, using=None, **kwargs) -> None:
+        pk = instance.pk
+        if not self.cache_invalidation:
+            if self.local_cache is not None:
+                self.local_cache.delete_group(self._create_object_cache_key(pk))
+            return
+
+        self.invalidate_cached(pk)
+        if transaction.get_connection(using).in_atomic_block:
+            # other processes might have cached the old object again before commit
+            transaction.on_commit(lambda: self.invalidate_cached(pk), using=using)
+
     def _fetch_object_for_cache(self, pk, select_related: str = None):
         qs = self.select_related(select_related) if select_related else self
         return qs.get(pk=pk)
 
+    def _fetch_objects_for_cache(self, pks: list, select_related: str = None):
+        qs = self.select_related(select_related) if select_related else self
+        return qs.filter(pk__in=pks)
+
+
+class QuerysetCacheMode(str, Enum):
+    """Modes for caching querysets with :func:`cached_queryset`."""
+
+    QUERYSET = "queryset"  #: Caches the pickled queryset
+    PKS = "pks"  #: Caches the primary keys and fetches objects with one query
+    VALUES = "values"  #: Caches the field values and rebuilds objects without query
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class CachedQuerysetResult(list):
+    """List of objects returned by :func:`cached_queryset` for evaluated modes.
+
+    Attributes:
+        payload_size: Size of the payload stored in the cache in bytes
+    """
+
+    def __init__(self, objs: Iterable = (), payload_size: int = 0) -> None:
+        super().__init__(objs)
+        self.payload_size = payload_size
+
 
 def cached_queryset(
-    queryset: models.QuerySet, key: str, timeout: Union[int, float]
-) -> models.QuerySet:
+    queryset: models.QuerySet,
+    key: str,
+    timeout: Union[int, float],
+    stampede_protection: bool = False,
+    mode: Union[QuerysetCacheMode, str] = QuerysetCacheMode.QUERYSET,
+    depends_on: Iterable[Type[models.Model]] = None,
+) -> Union[models.QuerySet, CachedQuerysetResult]:
     """caches the given queryset
 
     Args:
         queryset: the query set to cache
         key: key to be used to reference this cache
         timeout: Timeout in seconds for cache
+        stampede_protection: When True only one process at a time \
+            will recompute an expired queryset \
+            and querysets are refreshed before they expire. \
+            See also :func:`stampede_protection_stats`.
+        mode: How to store the queryset in the cache. \
+            With :attr:`~QuerysetCacheMode.PKS` and :attr:`~QuerysetCacheMode.VALUES` \
+            the queryset is evaluated once and only a compact payload is stored, \
+            but annotations, ``select_related`` and ``prefetch_related`` \
+            are not preserved.
+        depends_on: Models this queryset depends on. \
+            The cached queryset is invalidated when an object of any of these models \
+            is saved or deleted or when :func:`invalidate_cached_querysets` is called. \
+            Changes are only detected in processes where the model is registered, \
+            so models which do not use :class:`ObjectCacheMixin` \
+            must be registered with :func:`register_queryset_dependency`.
 
     Returns:
-        query set
+        query set or :class:`CachedQuerysetResult` for evaluated modes
 
     Example:
 
@@ -85,8 +783,587 @@ def cached_queryset(
             queryset = cached_queryset(
                 MyModel.objects.filter(name__contains="dummy"),
                 key="my_cache_key",
-                timeout=3600
+                timeout=3600,
+                depends_on=[MyModel],
+            )
+
+    """
+    if depends_on:
+        key = _add_generations_to_key(key, depends_on)
+    mode = QuerysetCacheMode(mode)
+    if mode is QuerysetCacheMode.QUERYSET:
+        func = functools.partial(_return_value, queryset)
+    else:
+        func = functools.partial(_create_queryset_payload, queryset, mode)
+    meta = queryset.model._meta
+    metrics_name = f"queryset.{meta.app_label}.{meta.model_name}"
+    func = metrics.track_calls(func, metrics_name)
+    if stampede_protection:
+        result = _get_or_set_protected(key, func, timeout)
+    else:
+        result = _unwrap_entry(cache.get_or_set(key, func, timeout))
+    metrics.count_hit(func, metrics_name)
+    if mode is QuerysetCacheMode.QUERYSET:
+        return result
+    if not _is_queryset_payload_current(queryset, mode, result):
+        cache.delete(key)
+        return cached_queryset(queryset, key, timeout, stampede_protection, mode)
+    return _rebuild_from_queryset_payload(queryset, result)
+
+
+async def acached_queryset(
+    queryset: models.QuerySet,
+    key: str,
+    timeout: Union[int, float],
+    stampede_protection: bool = False,
+    mode: Union[QuerysetCacheMode, str] = QuerysetCacheMode.QUERYSET,
+    depends_on: Iterable[Type[models.Model]] = None,
+) -> Union[models.QuerySet, CachedQuerysetResult]:
+    """Async variant of :func:`cached_queryset`.
+
+    Querysets are always returned evaluated,
+    so they can be iterated in async code without hitting the DB.
+    """
+    return await sync_to_async(_cached_queryset_evaluated)(
+        queryset=queryset,
+        key=key,
+        timeout=timeout,
+        stampede_protection=stampede_protection,
+        mode=mode,
+        depends_on=list(depends_on) if depends_on else None,
+    )
+
+
+def _cached_queryset_evaluated(**kwargs) -> Union[models.QuerySet, list]:
+    result = cached_queryset(**kwargs)
+    len(result)  # evaluates the queryset if needed
+    return result
+
+
+def register_queryset_dependency(model: Type[models.Model]) -> None:
+    """Register a model, so cached querysets depending on it are invalidated
+    when its objects are saved or deleted.
+
+    This should be called for every model used in ``depends_on``
+    of :func:`cached_queryset`, which does not use :class:`ObjectCacheMixin`.
+    Register the models when the app is ready,
+    so changes are also detected in processes that never call
+    :func:`cached_queryset`, e.g. workers.
+
+    Args:
+        model: Model class used in ``depends_on`` of :func:`cached_queryset`
+
+    Example:
+
+    .. code-block:: python
+
+        class MyAppConfig(AppConfig):
+            name = "myapp"
+
+            def ready(self):
+                from .models import MyModel
+
+                register_queryset_dependency(MyModel)
+    """
+    if model in _queryset_dependencies:
+        return
+    dispatch_uid = f"app_utils_queryset_invalidation_{_create_generation_key(model)}"
+    post_save.connect(
+        _on_model_changed, sender=model, weak=False, dispatch_uid=dispatch_uid
+    )
+    post_delete.connect(
+        _on_model_changed, sender=model, weak=False, dispatch_uid=dispatch_uid
+    )
+    _queryset_dependencies.add(model)
+
+
+_queryset_dependencies = set()  # models registered for invalidating querysets
+
+
+def invalidate_cached_querysets(model: Type[models.Model]) -> None:
+    """Invalidate all cached querysets which depend on the given model.
+
+    Args:
+        model: Model class used in ``depends_on`` of :func:`cached_queryset`
+    """
+    key = _create_generation_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        _init_generation(key)
+
+
+def _create_generation_key(model: Type[models.Model]) -> str:
+    return "APP_UTILS_GENERATION_{}_{}".format(
+        model._meta.app_label, model._meta.model_name
+    )
+
+
+def _init_generation(key: str) -> int:
+    """Initialize a missing generation counter and return its value.
+
+    Counters start at a random value,
+    so they do not reuse a generation from before they were lost.
+    """
+    generation = random.getrandbits(62)
+    cache.add(key, generation, None)
+    current = cache.get(key)
+    return generation if current is None else current
+
+
+def _init_generations(keys: list, timeout: int = None) -> Dict[str, int]:
+    """Initialize many missing generation counters at once and return their values.
+
+    Counters start at random values like with :func:`_init_generation`.
+    Concurrent calls may overwrite each other's values,
+    which only causes cache misses.
+    """
+    generations = {key: random.getrandbits(62) for key in keys}
+    cache.set_many(generations, timeout)
+    generations.update(cache.get_many(keys))
+    return generations
+
+
+def _add_generations_to_key(key: str, depends_on: Iterable[Type[models.Model]]) -> str:
+    """Return key with the current generations of all models added.
+
+    Querysets are thereby invalidated in O(1) by incrementing a generation counter,
+    instead of having to delete each cache key.
+    """
+    generation_keys = []
+    for model in depends_on:
+        register_queryset_dependency(model)
+        generation_keys.append(_create_generation_key(model))
+    generations = cache.get_many(generation_keys)
+    parts = [
+        str(generations[gen_key])
+        if gen_key in generations
+        else str(_init_generation(gen_key))
+        for gen_key in generation_keys
+    ]
+    return f"{key}_GEN_{'_'.join(parts)}"
+
+
+def _on_model_changed(sender, using=None, **kwargs) -> None:
+    invalidate_cached_querysets(sender)
+    if transaction.get_connection(using).in_atomic_block:
+        # other processes might have cached the old queryset again before commit
+        transaction.on_commit(lambda: invalidate_cached_querysets(sender), using=using)
+
+
+def _wait_for_max_rate(started: float, count: int, max_rate: float = None) -> None:
+    """Wait until the rate of count since started is below max_rate."""
+    if max_rate:
+        wait_secs = started + count / max_rate - monotonic()
+        if wait_secs > 0:
+            sleep(wait_secs)
+
+
+def _compose(outer: Callable, inner: Callable) -> Callable:
+    """Return a function, which calls outer with the result of inner."""
+
+    def func(*args, **kwargs):
+        return outer(inner(*args, **kwargs))
+
+    return func
+
+
+def _return_value(value):
+    return value
+
+
+# Evaluated queryset as stored in the cache
+# fields: attnames of the stored fields or None for pks
+# rows: tuples of field values or pks
+# size: size of fields and rows when pickled in bytes
+_QuerysetPayload = namedtuple("_QuerysetPayload", ["mode", "fields", "rows", "size"])
+
+
+def _create_queryset_payload(
+    queryset: models.QuerySet, mode: QuerysetCacheMode
+) -> _QuerysetPayload:
+    if mode is QuerysetCacheMode.PKS:
+        fields = None
+        rows = list(queryset.values_list("pk", flat=True))
+    else:
+        fields = _concrete_attnames(queryset.model)
+        rows = list(queryset.values_list(*fields))
+    size = len(pickle.dumps((fields, rows), pickle.HIGHEST_PROTOCOL))
+    return _QuerysetPayload(str(mode), fields, rows, size)
+
+
+def _is_queryset_payload_current(
+    queryset: models.QuerySet, mode: QuerysetCacheMode, payload: _QuerysetPayload
+) -> bool:
+    """Return True if the payload matches the mode and the current fields of the model.
+
+    The fields differ e.g. when the payload was stored before a migration.
+    """
+    if payload.mode != str(mode):
+        return False
+    return payload.fields is None or payload.fields == _concrete_attnames(
+        queryset.model
+    )
+
+
+def _concrete_attnames(model: Type[models.Model]) -> tuple:
+    return tuple(field.attname for field in model._meta.concrete_fields)
+
+
+def _rebuild_from_queryset_payload(
+    queryset: models.QuerySet, payload: _QuerysetPayload
+) -> CachedQuerysetResult:
+    model = queryset.model
+    if payload.mode == QuerysetCacheMode.PKS:
+        objs_by_pk = model._base_manager.using(queryset.db).in_bulk(payload.rows)
+        objs = [objs_by_pk[pk] for pk in payload.rows if pk in objs_by_pk]
+    else:
+        objs = [model.from_db(queryset.db, payload.fields, row) for row in payload.rows]
+    return CachedQuerysetResult(objs, payload_size=payload.size)
+
+
+class CacheTier(str, Enum):
+    """Cache tiers for :func:`cached`."""
+
+    LOCAL = "local"  #: Bounded LRU cache in the memory of the current process
+    DJANGO = "django"  #: Django cache shared by all processes
+    BOTH = "both"  #: Local cache in front of the Django cache
+
+    def __str__(self) -> str:
+        return self.value
+
+
+_MISSING = object()
+
+
+def cached(
+    timeout: int = None,
+    key: Callable = None,
+    tier: CacheTier = CacheTier.DJANGO,
+    max_entries: int = 1000,
+) -> Callable:
+    """Decorator for caching the return values of a function.
+
+    Works with normal functions and coroutine functions.
+    Cache keys are derived from the function's module and name
+    and a hash of its arguments, like the keys of :func:`~app_utils.helpers.throttle`.
+
+    The decorated function has these additional methods:
+
+    - ``invalidate(*args, **kwargs)``: Remove the cached value for these arguments
+    - ``stats()``: Return the number of hits and misses in the current process \
+        and the number of entries in the local cache
+
+    Args:
+        timeout: Timeout for cached values in seconds. \
+            Uses the default timeout of the Django cache when not specified \
+            and 60 seconds for the local cache.
+        key: Function called with the arguments of each call, \
+            which returns the part of the key for these arguments. \
+            When not specified the key is built from all arguments, \
+            which must then be primitives like numbers, strings and dates, \
+            saved model instances, enums or lists and tuples of them. \
+            Model instances are identified by their model and primary key.
+        tier: Where to cache the return values. \
+            Values from the local cache are shared by all callers in the process \
+            and must not be mutated.
+        max_entries: Max number of entries in the local cache
+
+    Example:
+
+    .. code-block:: python
+
+        @cached(timeout=3600, key=lambda user: user.pk, tier=CacheTier.BOTH)
+        def character_count(user):
+            return user.character_ownerships.count()
+
+        character_count.invalidate(user)
+    """
+    tier = CacheTier(tier)
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+        metrics_name = f"cached.{name}"
+        local_cache = (
+            LocalCache(max_entries=max_entries, timeout=timeout or 60)
+            if tier is not CacheTier.DJANGO
+            else None
+        )
+        use_django_cache = tier is not CacheTier.LOCAL
+        counter = Counter()
+        lock = threading.Lock()
+
+        def create_key(args, kwargs) -> str:
+            if key:
+                context = key(*args, **kwargs)
+            else:
+                context = _create_arguments_key(args, sorted(kwargs.items()))
+            hashed_id = hashlib.md5(f"{name}_{context}".encode("utf-8")).hexdigest()
+            return f"APP_UTILS_CACHED_{hashed_id}"
+
+        def lookup(cache_key: str):
+            if local_cache is not None:
+                value = local_cache.get(cache_key, _MISSING)
+                if value is not _MISSING:
+                    return value
+            if not use_django_cache:
+                return _MISSING
+            value = cache.get(cache_key, _MISSING)
+            if value is not _MISSING and local_cache is not None:
+                local_cache.set(cache_key, value)
+            return value
+
+        def store(cache_key: str, value) -> None:
+            if local_cache is not None:
+                local_cache.set(cache_key, value)
+            if use_django_cache:
+                cache.set(
+                    cache_key, value, DEFAULT_TIMEOUT if timeout is None else timeout
+                )
+
+        def count(event: str) -> None:
+            with lock:
+                counter[event] += 1
+            if metrics.get_metrics_sink() is not None:
+                metrics.incr(f"{metrics_name}.{event}")
+
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                cache_key = create_key(args, kwargs)
+                if use_django_cache:
+                    value = await sync_to_async(lookup)(cache_key)
+                else:
+                    value = lookup(cache_key)
+                if value is not _MISSING:
+                    count("hits")
+                    return value
+                count("misses")
+                started = perf_counter()
+                value = await func(*args, **kwargs)
+                metrics.timing(f"{metrics_name}.recompute", perf_counter() - started)
+                if use_django_cache:
+                    await sync_to_async(store)(cache_key, value)
+                else:
+                    store(cache_key, value)
+                return value
+
+        else:
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                cache_key = create_key(args, kwargs)
+                value = lookup(cache_key)
+                if value is not _MISSING:
+                    count("hits")
+                    return value
+                count("misses")
+                started = perf_counter()
+                value = func(*args, **kwargs)
+                metrics.timing(f"{metrics_name}.recompute", perf_counter() - started)
+                store(cache_key, value)
+                return value
+
+        def invalidate(*args, **kwargs) -> None:
+            cache_key = create_key(args, kwargs)
+            if local_cache is not None:
+                local_cache.delete(cache_key)
+            if use_django_cache:
+                cache.delete(cache_key)
+
+        def stats() -> Dict[str, int]:
+            with lock:
+                return {
+                    "hits": counter["hits"],
+                    "misses": counter["misses"],
+                    "entries": len(local_cache) if local_cache is not None else 0,
+                }
+
+        wrapper.invalidate = invalidate
+        wrapper.stats = stats
+        return wrapper
+
+    return decorator
+
+
+_KEY_PRIMITIVE_TYPES = (
+    type(None),
+    bool,
+    int,
+    float,
+    str,
+    bytes,
+    Decimal,
+    dt.date,
+    dt.time,
+    dt.timedelta,
+    UUID,
+)
+
+
+def _create_arguments_key(*values) -> str:
+    """Return a key for arguments, which is stable across processes.
+
+    Raises:
+        TypeError: when an argument has no stable representation
+    """
+    parts = []
+    for value in values:
+        if isinstance(value, _KEY_PRIMITIVE_TYPES):
+            parts.append(repr(value))
+        elif isinstance(value, Enum):
+            parts.append(f"{type(value).__qualname__}.{value.name}")
+        elif isinstance(value, models.Model):
+            if value.pk is None:
+                raise TypeError(f"Can not create key for unsaved object: {value!r}")
+            parts.append(f"{value._meta.label_lower}:{value.pk!r}")
+        elif isinstance(value, (list, tuple)):
+            parts.append(f"{type(value).__name__}({_create_arguments_key(*value)})")
+        else:
+            raise TypeError(
+                f"Can not create key for argument of type {type(value).__name__}. "
+                "Please define key for cached."
             )
+    return ",".join(parts)
+
+
+def stampede_protection_stats() -> Dict[str, int]:
+    """Return counters for caching with stampede protection of the current process.
 
+    The counters are:
+
+    - ``hits``: Values returned from cache without recomputing, \
+        incl. values not yet expired while another process refreshes them early
+    - ``recomputes``: Values recomputed, incl. early refreshes
+    - ``early_refreshes``: Values recomputed before they expired
+    - ``stale_served``: Expired values returned while another process recomputed
+    - ``waited``: Missing values returned after waiting for another process
+    - ``saved``: Recomputations saved, i.e. ``stale_served`` + ``waited``
     """
-    return cache.get_or_set(key, lambda: queryset, timeout)
+    with _stampede_stats_lock:
+        stats = {
+            name: _stampede_stats[name]
+            for name in (
+                "hits",
+                "recomputes",
+                "early_refreshes",
+                "stale_served",
+                "waited",
+            )
+        }
+    stats["saved"] = stats["stale_served"] + stats["waited"]
+    return stats
+
+
+def reset_stampede_protection_stats() -> None:
+    """Reset all counters for caching with stampede protection to zero."""
+    with _stampede_stats_lock:
+        _stampede_stats.clear()
+
+
+# Cache entry with stampede protection
+# expires_at: time when the entry expires in seconds since epoch or None for never
+# delta: time it took to compute the value in seconds
+_ProtectedEntry = namedtuple("_ProtectedEntry", ["value", "expires_at", "delta"])
+
+_stampede_stats = Counter()
+_stampede_stats_lock = threading.Lock()
+
+
+def _count_stampede_event(name: str) -> None:
+    with _stampede_stats_lock:
+        _stampede_stats[name] += 1
+
+
+def _unwrap_entry(value):
+    """Return the value of a cache entry, which may be stampede protected."""
+    return value.value if isinstance(value, _ProtectedEntry) else value
+
+
+def _get_or_set_protected(key: str, func: Callable, timeout: Union[int, float]):
+    """Variant of ``cache.get_or_set()`` with protection against cache stampedes.
+
+    Combines a cache based lock, which ensures that only one process
+    recomputes an entry at the same time, with a probabilistic early refresh
+    of entries before they expire (aka "XFetch").
+    """
+    entry = cache.get(key)
+    if isinstance(entry, _ProtectedEntry):
+        if not _is_refresh_due(entry):
+            _count_stampede_event("hits")
+            return entry.value
+
+    lock_key = f"{key}_LOCK"
+    has_lock = cache.add(lock_key, 1, APP_UTILS_CACHE_STAMPEDE_LOCK_TIMEOUT)
+    if not has_lock:
+        if isinstance(entry, _ProtectedEntry):
+            if time() < entry.expires_at:  # early refresh by another process
+                _count_stampede_event("hits")
+            else:
+                _count_stampede_event("stale_served")
+            return entry.value
+
+        entry = _wait_for_entry(key)
+        if entry:
+            _count_stampede_event("waited")
+            return entry.value
+
+    try:
+        if isinstance(entry, _ProtectedEntry) and time() < entry.expires_at:
+            _count_stampede_event("early_refreshes")
+        _count_stampede_event("recomputes")
+        started = time()
+        value = func()
+        finished = time()
+        if value is not None:
+            _set_protected(key, value, timeout, finished, delta=finished - started)
+    finally:
+        if has_lock:
+            cache.delete(lock_key)
+
+    return value
+
+
+def _is_refresh_due(entry: _ProtectedEntry) -> bool:
+    """Return True when an entry has expired or is selected for early refresh.
+
+    The probability for an early refresh increases as an entry approaches expiry
+    and with the time it took to compute that entry.
+    """
+    if entry.expires_at is None:
+        return False
+    early_by = (
+        -entry.delta * APP_UTILS_CACHE_STAMPEDE_BETA * math.log(1.0 - random.random())
+    )
+    return time() + early_by >= entry.expires_at
+
+
+def _wait_for_entry(key: str) -> Union[_ProtectedEntry, None]:
+    """Wait for another process to store an entry and return it when available."""
+    deadline = time() + APP_UTILS_CACHE_STAMPEDE_WAIT_TIMEOUT
+    while time() < deadline:
+        sleep(0.05)
+        entry = cache.get(key)
+        if isinstance(entry, _ProtectedEntry):
+            return entry
+    return None
+
+
+def _set_protected(
+    key: str, value, timeout: Union[int, float], now: float, delta: float
+) -> None:
+    entry, cache_timeout = _create_protected_entry(value, timeout, now, delta)
+    cache.set(key, entry, cache_timeout)
+
+
+def _create_protected_entry(
+    value, timeout: Union[int, float], now: float, delta: float
+) -> Tuple[_ProtectedEntry, Union[int, float, None]]:
+    """Return a new protected entry and the timeout for storing it in the cache."""
+    if timeout is None:
+        return _ProtectedEntry(value, None, delta), None
+    return (
+        _ProtectedEntry(value, now + timeout, delta),
+        timeout + APP_UTILS_CACHE_STAMPEDE_GRACE_PERIOD,
+    )
@@ -1,22 +1,61 @@
+import asyncio
+import bisect
 import datetime as dt
 import logging
+import math
+import os
 import random
-from time import sleep
-from typing import Optional
+import threading
+from contextlib import contextmanager
+from time import sleep, time
+from typing import Iterable, Optional, Tuple
 
 import requests
+from asgiref.sync import sync_to_async
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 
+from django.core.cache import cache
 from django.utils.timezone import now
 
 from app_utils.logging import LoggerAddTag
 
 from . import __title__, __version__
 from ._app_settings import (
+    APPUTILS_ESI_CIRCUIT_BREAKER_COOLDOWN,
+    APPUTILS_ESI_CIRCUIT_BREAKER_THRESHOLD,
     APPUTILS_ESI_DAILY_DOWNTIME_END,
     APPUTILS_ESI_DAILY_DOWNTIME_START,
+    APPUTILS_ESI_DAILY_DOWNTIMES,
+    APPUTILS_ESI_ERROR_BUDGET_THRESHOLD,
     APPUTILS_ESI_ERROR_LIMIT_THRESHOLD,
+    APPUTILS_ESI_HTTP_POOL_MAXSIZE,
+    APPUTILS_ESI_OFFLINE_RETRY_DELAY,
+    APPUTILS_ESI_RETRY_RAMP_DURATION,
+    APPUTILS_ESI_RETRY_RELEASE_RATE,
+    APPUTILS_ESI_STATUS_CACHE_TIMEOUT,
 )
 
+ESI_STATUS_URL = "https://esi.evetech.net/latest/status/"
+ESI_STATUS_MAX_RETRIES = 3
+ESI_STATUS_RETRY_CODES = {
+    502,  # HTTPBadGateway
+    503,  # HTTPServiceUnavailable
+    504,  # HTTPGatewayTimeout
+}
+
+ESI_STATUS_CACHE_KEY = "APP_UTILS_ESI_STATUS"
+ESI_STATUS_LOCK_CACHE_KEY = "APP_UTILS_ESI_STATUS_LOCK"
+ESI_STATUS_LOCK_TIMEOUT = 40  # longer than the max duration of a status request
+ESI_STATUS_WAIT_TIMEOUT = 5
+ESI_ERROR_BUDGET_CACHE_KEY = "APP_UTILS_ESI_ERROR_BUDGET"
+ESI_ERROR_BUDGET_RESET_CACHE_KEY = "APP_UTILS_ESI_ERROR_BUDGET_RESET_AT"
+ESI_RETRY_RELEASE_CACHE_KEY = "APP_UTILS_ESI_RETRY_RELEASE_AT"
+ESI_BREAKER_OPEN_CACHE_KEY = "APP_UTILS_ESI_BREAKER_OPEN"
+ESI_BREAKER_FAILURES_CACHE_KEY = "APP_UTILS_ESI_BREAKER_FAILURES"
+ESI_BREAKER_PROBE_CACHE_KEY = "APP_UTILS_ESI_BREAKER_PROBE"
+ESI_BREAKER_FAILURES_TIMEOUT = 3600
+
 logger = LoggerAddTag(logging.getLogger(__name__), __title__)
 
 
@@ -49,7 +88,18 @@ class EsiErrorLimitExceeded(EsiStatusException):
 
 
 class EsiStatus:
-    """Current status of ESI (immutable)."""
+    """Current status of ESI (immutable).
+
+    All derived properties are computed once when the status is created.
+    """
+
+    __slots__ = (
+        "_is_online",
+        "_error_limit_remain",
+        "_error_limit_reset",
+        "_is_error_limit_exceeded",
+        "_is_ok",
+    )
 
     MAX_JITTER = 20
 
@@ -63,14 +113,20 @@ class EsiStatus:
         if error_limit_remain is None or error_limit_reset is None:
             self._error_limit_remain = None
             self._error_limit_reset = None
+            self._is_error_limit_exceeded = False
         else:
             self._error_limit_remain = int(error_limit_remain)
             self._error_limit_reset = int(error_limit_reset)
+            self._is_error_limit_exceeded = bool(
+                self._error_limit_reset
+                and self._error_limit_remain <= APPUTILS_ESI_ERROR_LIMIT_THRESHOLD
+            )
+        self._is_ok = self._is_online and not self._is_error_limit_exceeded
 
     @property
     def is_ok(self) -> bool:
         """True if ESI is online and below error limit, else False."""
-        return self.is_online and not self.is_error_limit_exceeded
+        return self._is_ok
 
     @property
     def is_online(self) -> bool:
@@ -93,11 +149,21 @@ class EsiStatus:
 
         Will also return False if remain/reset are not defined
         """
-        return bool(
-            self.error_limit_remain
-            and self.error_limit_reset
-            and self.error_limit_remain <= APPUTILS_ESI_ERROR_LIMIT_THRESHOLD
-        )
+        return self._is_error_limit_exceeded
+
+    @property
+    def retry_in(self) -> int:
+        """Seconds until the error limit is no longer exceeded, else 0."""
+        return self._error_limit_reset if self._is_error_limit_exceeded else 0
+
+    def to_tuple(self) -> tuple:
+        """Convert into a tuple, e.g. for storing in the cache."""
+        return (self._is_online, self._error_limit_remain, self._error_limit_reset)
+
+    @classmethod
+    def from_tuple(cls, values: tuple) -> "EsiStatus":
+        """Create new object from a tuple created with :meth:`to_tuple`."""
+        return cls(*values)
 
     def error_limit_reset_w_jitter(self, max_jitter: int = None) -> int:
         """Calc seconds to retry in order to reach next error window incl. jitter."""
@@ -118,6 +184,101 @@ class EsiStatus:
             raise EsiErrorLimitExceeded(retry_in=self.error_limit_reset_w_jitter())
 
 
+class DailyDowntime:
+    """Daily downtimes of ESI on a given day (immutable).
+
+    Downtimes may wrap past midnight. Overlapping downtimes are merged.
+
+    Args:
+        day: Day the downtimes apply to
+        windows: Start and end of each downtime in UTC hours, \
+            e.g. ``[(11.0, 11.25)]``
+        tzinfo: Timezone of the datetimes to be checked against the downtimes
+    """
+
+    def __init__(
+        self, day: dt.date, windows: Iterable[tuple], tzinfo: dt.tzinfo = None
+    ) -> None:
+        self.day = day
+        self.windows = tuple(tuple(window) for window in windows)
+        self.tzinfo = tzinfo
+        intervals = []
+        for days in (-1, 0):  # downtimes from yesterday may wrap into today
+            midnight = dt.datetime.combine(
+                day + dt.timedelta(days=days), dt.time(), tzinfo
+            )
+            for start_hours, end_hours in self.windows:
+                start = midnight + dt.timedelta(hours=start_hours)
+                end = midnight + dt.timedelta(hours=end_hours)
+                if end <= start:
+                    end += dt.timedelta(days=1)
+                intervals.append((start, end))
+        self._starts = []
+        self._ends = []
+        for start, end in sorted(intervals):
+            if self._ends and start <= self._ends[-1]:
+                self._ends[-1] = max(self._ends[-1], end)
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+
+    def is_in_downtime(self, at: dt.datetime = None) -> bool:
+        """True if ESI is in a downtime, else False.
+
+        Args:
+            at: Time to check. Defaults to now.
+        """
+        return self._downtime_end(at or now()) is not None
+
+    def seconds_until_up(self, at: dt.datetime = None) -> float:
+        """Seconds until the current downtime ends or 0 if ESI is not in a downtime.
+
+        Args:
+            at: Time to check. Defaults to now.
+        """
+        if at is None:
+            at = now()
+        end = self._downtime_end(at)
+        return (end - at).total_seconds() if end else 0.0
+
+    def _downtime_end(self, at: dt.datetime) -> Optional[dt.datetime]:
+        idx = bisect.bisect_right(self._starts, at) - 1
+        if idx >= 0 and at <= self._ends[idx]:
+            return self._ends[idx]
+        return None
+
+
+def daily_downtime() -> DailyDowntime:
+    """Return the daily downtimes of ESI for today.
+
+    The downtimes are computed once per day and process.
+    """
+    return _daily_downtime(now())
+
+
+_daily_downtime_cached = None
+
+
+def _daily_downtime(at: dt.datetime) -> DailyDowntime:
+    global _daily_downtime_cached
+    if APPUTILS_ESI_DAILY_DOWNTIMES:
+        windows = tuple(tuple(window) for window in APPUTILS_ESI_DAILY_DOWNTIMES)
+    else:
+        windows = (
+            (APPUTILS_ESI_DAILY_DOWNTIME_START, APPUTILS_ESI_DAILY_DOWNTIME_END),
+        )
+    downtime = _daily_downtime_cached
+    if (
+        downtime is None
+        or downtime.day != at.date()
+        or downtime.windows != windows
+        or downtime.tzinfo != at.tzinfo
+    ):
+        downtime = DailyDowntime(at.date(), windows, at.tzinfo)
+        _daily_downtime_cached = downtime
+    return downtime
+
+
 def fetch_esi_status(ignore_daily_downtime: bool = False) -> EsiStatus:
     """Determine the current ESI status.
 
@@ -125,13 +286,235 @@ def fetch_esi_status(ignore_daily_downtime: bool = False) -> EsiStatus:
         ignore_daily_downtime: When True will always make a request to ESI \
             even during the daily downtime
     """
-    if not ignore_daily_downtime:
-        downtime_start = _calc_downtime(APPUTILS_ESI_DAILY_DOWNTIME_START)
-        downtime_end = _calc_downtime(APPUTILS_ESI_DAILY_DOWNTIME_END)
-        if now() >= downtime_start and now() <= downtime_end:
-            return EsiStatus(is_online=False)
+    if not ignore_daily_downtime and _is_daily_downtime():
+        return EsiStatus(is_online=False)
+
+    return _fetch_esi_status_from_esi()
+
+
+async def afetch_esi_status(ignore_daily_downtime: bool = False) -> EsiStatus:
+    """Determine the current ESI status. Async variant of :func:`fetch_esi_status`.
+
+    Waits between retries without blocking the event loop.
+
+    Args:
+        ignore_daily_downtime: When True will always make a request to ESI \
+            even during the daily downtime
+    """
+    if not ignore_daily_downtime and _is_daily_downtime():
+        return EsiStatus(is_online=False)
+
+    if not await sync_to_async(_esi_breaker_allows_request)():
+        return EsiStatus(is_online=False)
+    r = await _arequest_esi_status()
+    status = await sync_to_async(_esi_status_from_response)(r)
+    await sync_to_async(_record_esi_breaker_result)(status.is_online)
+    return status
+
+
+def fetch_esi_status_cached(ignore_daily_downtime: bool = False) -> EsiStatus:
+    """Determine the current ESI status from a status shared by all processes.
+
+    The status is fetched again from ESI when it is older than
+    ``APPUTILS_ESI_STATUS_CACHE_TIMEOUT``. Only one process at a time will fetch it,
+    while all others wait for the result.
+
+    The error limit reset is adjusted for the age of the shared status.
+    Calls do not change the error limit remain.
+    Use :func:`esi_error_budget` to account for errors caused by requests.
+
+    Args:
+        ignore_daily_downtime: When True will always report the status from ESI \
+            even during the daily downtime
+    """
+    if not ignore_daily_downtime and _is_daily_downtime():
+        return EsiStatus(is_online=False)
+
+    entry = cache.get(ESI_STATUS_CACHE_KEY)
+    if entry is None:
+        if cache.add(ESI_STATUS_LOCK_CACHE_KEY, 1, ESI_STATUS_LOCK_TIMEOUT):
+            try:
+                status = _fetch_esi_status_from_esi()
+                _store_esi_status(status)
+            finally:
+                cache.delete(ESI_STATUS_LOCK_CACHE_KEY)
+            return status
+
+        entry = _wait_for_esi_status()
+        if entry is None:
+            logger.warning("Timeout while waiting for ESI status from other process")
+            return _fetch_esi_status_from_esi()
+
+    return _esi_status_from_cache_entry(entry)
+
+
+def record_esi_response(response) -> None:
+    """Update the shared ESI status from the response of any ESI endpoint.
+
+    Every ESI response contains the current error limit in its headers,
+    so feeding regular responses keeps the status used by
+    :func:`fetch_esi_status_cached` up-to-date without extra requests to ESI.
+    Also updates the shared error budget.
+
+    Responses with HTTP status 502, 503 or 504 only update the error limit,
+    since they do not prove whether ESI is online.
+
+    Args:
+        response: Response from ESI with ``status_code`` and ``headers``, \
+            e.g. from requests or bravado
+
+    Example:
+
+    .. code-block:: python
+
+        data, response = (
+            esi.client.Universe.get_universe_types_type_id(type_id=42).result()
+        )
+        record_esi_response(response)
+    """
+    error_limit = _parse_error_limit_headers(response.headers)
+    if not error_limit:
+        return
+    remain, reset = error_limit
+    update_esi_error_budget(remain, reset)
+    if response.status_code in ESI_STATUS_RETRY_CODES:
+        entry = cache.get(ESI_STATUS_CACHE_KEY)
+        if entry is None:
+            return
+        is_online = entry[0]
+    else:
+        is_online = True
+    _store_esi_status(
+        EsiStatus(
+            is_online=is_online, error_limit_remain=remain, error_limit_reset=reset
+        )
+    )
+
+
+def esi_response_hook(response, *args, **kwargs) -> None:
+    """Response hook for requests, which records all responses from ESI.
+
+    Example:
+
+    .. code-block:: python
+
+        session = requests.Session()
+        session.hooks["response"].append(esi_response_hook)
+    """
+    record_esi_response(response)
+
+
+def _parse_error_limit_headers(headers) -> Optional[Tuple[int, int]]:
+    """Return remain and reset from the error limit headers of an ESI response
+    or None if they are missing or invalid.
+    """
+    headers = CaseInsensitiveDict(headers)
+    try:
+        return (
+            int(headers["X-Esi-Error-Limit-Remain"]),
+            int(headers["X-Esi-Error-Limit-Reset"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _store_esi_status(status: EsiStatus) -> None:
+    entry = status.to_tuple() + (time(),)
+    cache.set(ESI_STATUS_CACHE_KEY, entry, APPUTILS_ESI_STATUS_CACHE_TIMEOUT)
+
+
+def _wait_for_esi_status() -> Optional[tuple]:
+    deadline = time() + ESI_STATUS_WAIT_TIMEOUT
+    while time() < deadline:
+        sleep(0.1)
+        entry = cache.get(ESI_STATUS_CACHE_KEY)
+        if entry is not None:
+            return entry
+    return None
+
+
+def _esi_status_from_cache_entry(entry: tuple) -> EsiStatus:
+    is_online, remain, reset, fetched_at = entry
+    if remain is None or reset is None:
+        return EsiStatus.from_tuple(entry[:3])
+    reset = max(0, reset - int(time() - fetched_at))
+    return EsiStatus(
+        is_online=is_online, error_limit_remain=remain, error_limit_reset=reset
+    )
+
+
+def _is_daily_downtime() -> bool:
+    at = now()
+    return _daily_downtime(at).is_in_downtime(at)
+
+
+def _fetch_esi_status_from_esi() -> EsiStatus:
+    if not _esi_breaker_allows_request():
+        return EsiStatus(is_online=False)
+    status = _esi_status_from_response(_request_esi_status())
+    _record_esi_breaker_result(status.is_online)
+    return status
+
+
+def esi_circuit_breaker_state() -> str:
+    """Return the current state of the circuit breaker for ESI status requests.
+
+    The circuit breaker is shared by all processes.
+    It opens after ``APPUTILS_ESI_CIRCUIT_BREAKER_THRESHOLD`` consecutive failed
+    requests and then reports ESI as offline without making any requests
+    for ``APPUTILS_ESI_CIRCUIT_BREAKER_COOLDOWN`` seconds.
+    After the cooldown it is half-open and lets a single request through
+    to probe whether ESI is back online.
+
+    Returns:
+        ``"closed"``, ``"open"`` or ``"half-open"``
+    """
+    values = cache.get_many(
+        [ESI_BREAKER_OPEN_CACHE_KEY, ESI_BREAKER_FAILURES_CACHE_KEY]
+    )
+    if values.get(ESI_BREAKER_OPEN_CACHE_KEY):
+        return "open"
+    if values.get(ESI_BREAKER_FAILURES_CACHE_KEY, 0) >= (
+        APPUTILS_ESI_CIRCUIT_BREAKER_THRESHOLD
+    ):
+        return "half-open"
+    return "closed"
+
+
+def _esi_breaker_allows_request() -> bool:
+    state = esi_circuit_breaker_state()
+    if state == "closed":
+        return True
+    if state == "half-open":
+        return cache.add(ESI_BREAKER_PROBE_CACHE_KEY, 1, ESI_STATUS_LOCK_TIMEOUT)
+    return False
+
+
+def _record_esi_breaker_result(is_online: bool) -> None:
+    if is_online:
+        cache.delete_many([ESI_BREAKER_FAILURES_CACHE_KEY, ESI_BREAKER_PROBE_CACHE_KEY])
+        return
+    cache.add(ESI_BREAKER_FAILURES_CACHE_KEY, 0, ESI_BREAKER_FAILURES_TIMEOUT)
+    try:
+        failures = cache.incr(ESI_BREAKER_FAILURES_CACHE_KEY)
+    except ValueError:
+        failures = 1
+    if failures >= APPUTILS_ESI_CIRCUIT_BREAKER_THRESHOLD:
+        cache.set(
+            ESI_BREAKER_OPEN_CACHE_KEY, True, APPUTILS_ESI_CIRCUIT_BREAKER_COOLDOWN
+        )
+        cache.delete(ESI_BREAKER_PROBE_CACHE_KEY)
+        logger.warning(
+            "ESI status requests failed %d times in a row. "
+            "Pausing requests for %d seconds.",
+            failures,
+            APPUTILS_ESI_CIRCUIT_BREAKER_COOLDOWN,
+        )
+
 
-    r = _request_esi_status()
+def _esi_status_from_response(r: Optional[requests.Response]) -> EsiStatus:
+    if r is None:
+        return EsiStatus(is_online=False)
     if not r.ok:
         is_online = False
     else:
@@ -140,88 +523,224 @@ def fetch_esi_status(ignore_daily_downtime: bool = False) -> EsiStatus:
         except ValueError:
             is_online = False
 
-    try:
-        remain = int(r.headers.get("X-Esi-Error-Limit-Remain"))
-        reset = int(r.headers.get("X-Esi-Error-Limit-Reset"))
-    except TypeError:
-        logger.warning("Failed to parse HTTP headers: %s", r.headers, exc_info=True)
+    error_limit = _parse_error_limit_headers(r.headers)
+    if not error_limit:
+        logger.warning("Failed to parse HTTP headers: %s", r.headers)
         return EsiStatus(is_online=is_online)
 
+    remain, reset = error_limit
     logger.debug(
         "ESI status: is_online: %s, error_limit_remain = %s, error_limit_reset = %s",
         is_online,
         remain,
         reset,
     )
+    update_esi_error_budget(remain, reset)
     return EsiStatus(
         is_online=is_online, error_limit_remain=remain, error_limit_reset=reset
     )
 
 
-def _calc_downtime(hours_float: float) -> dt.datetime:
-    hour, minute = _convert_float_hours(hours_float)
-    return now().replace(hour=hour, minute=minute)
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
 
 
-def _convert_float_hours(hours_float: float) -> tuple:
-    """Convert float hours into int hours and int minutes for datetime."""
-    h = int(hours_float)
-    m = int((hours_float - h) * 60)
-    return h, m
+def _esi_session() -> requests.Session:
+    """Return the HTTP session for requests to ESI of the current process.
 
+    Connections are kept open and re-used by all requests of the same process.
+    A new session is created after the process was forked,
+    so that processes never share connections.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=APPUTILS_ESI_HTTP_POOL_MAXSIZE
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["User-Agent"] = f"{__package__};{__version__}"
+                _session = session
+                _session_pid = pid
+    return _session
 
-def _request_esi_status() -> requests.Response:
-    """Make request to ESI about curren status with retries."""
-    max_retries = 3
+
+def _request_esi_status() -> Optional[requests.Response]:
+    """Make request to ESI about curren status with retries.
+
+    Returns None when ESI could not be reached.
+    """
+    session = _esi_session()
     retries = 0
     while True:
+        r = _send_esi_status_request(session)
+        if not _should_retry(r, retries):
+            return r
+        retries += 1
+        sleep(_retry_wait_secs(retries))
+
+
+async def _arequest_esi_status() -> Optional[requests.Response]:
+    """Make request to ESI about curren status with retries.
+
+    Async variant of :func:`_request_esi_status`.
+    The requests are made in a worker thread, so they do not block the event loop.
+    """
+    session = _esi_session()
+    send_request = sync_to_async(_send_esi_status_request, thread_sensitive=False)
+    retries = 0
+    while True:
+        r = await send_request(session)
+        if not _should_retry(r, retries):
+            return r
+        retries += 1
+        await asyncio.sleep(_retry_wait_secs(retries))
+
+
+def _send_esi_status_request(
+    session: requests.Session,
+) -> Optional[requests.Response]:
+    try:
+        return session.get(ESI_STATUS_URL, timeout=(5, 30))
+    except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+        logger.warning("Network error when trying to call ESI", exc_info=True)
+        return None
+
+
+def _should_retry(r: Optional[requests.Response], retries: int) -> bool:
+    if r is None or r.status_code not in ESI_STATUS_RETRY_CODES:
+        return False
+    if retries >= ESI_STATUS_MAX_RETRIES:
+        return False
+    logger.warning(
+        "HTTP status code %s - Retry %s/%s",
+        r.status_code,
+        retries + 1,
+        ESI_STATUS_MAX_RETRIES,
+    )
+    return True
+
+
+def _retry_wait_secs(retries: int) -> float:
+    return 0.1 * (random.uniform(2, 4) ** (retries - 1))
+
+
+def update_esi_error_budget(remain: int, reset: int) -> None:
+    """Update the shared ESI error budget from the error limit headers of ESI.
+
+    The budget is created when it does not exist yet for the current error window
+    and otherwise lowered, when ESI reports less remaining errors than the budget.
+    The budget expires with the current error window.
+
+    Args:
+        remain: Value of the header ``X-Esi-Error-Limit-Remain``
+        reset: Value of the header ``X-Esi-Error-Limit-Reset``
+    """
+    if reset <= 0:
+        return
+    if cache.add(ESI_ERROR_BUDGET_CACHE_KEY, remain, reset):
+        cache.set(ESI_ERROR_BUDGET_RESET_CACHE_KEY, time() + reset, reset)
+        return
+    current = cache.get(ESI_ERROR_BUDGET_CACHE_KEY)
+    if current is not None and remain < current:
         try:
-            r = requests.get(
-                "https://esi.evetech.net/latest/status/",
-                timeout=(5, 30),
-                headers={"User-Agent": f"{__package__};{__version__}"},
-            )
-        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
-            logger.warning("Network error when trying to call ESI", exc_info=True)
-            return EsiStatus(
-                is_online=False, error_limit_remain=None, error_limit_reset=None
-            )
-        if r.status_code not in {
-            502,  # HTTPBadGateway
-            503,  # HTTPServiceUnavailable
-            504,  # HTTPGatewayTimeout
-        }:
-            break
-        else:
-            retries += 1
-            if retries > max_retries:
-                break
-            else:
-                logger.warning(
-                    "HTTP status code %s - Retry %s/%s",
-                    r.status_code,
-                    retries,
-                    max_retries,
-                )
-                wait_secs = 0.1 * (random.uniform(2, 4) ** (retries - 1))
-                sleep(wait_secs)
-    return r
+            cache.decr(ESI_ERROR_BUDGET_CACHE_KEY, current - remain)
+        except ValueError:
+            pass
+
+
+def reserve_esi_error_budget(count: int = 1) -> None:
+    """Reserve errors from the shared ESI error budget.
+
+    Should be called before requests to ESI, which might fail.
+    Reserved errors can be returned with :func:`release_esi_error_budget`
+    once the request succeeded.
+
+    The reservation always succeeds when the budget is not known,
+    e.g. because a new error window has started.
+
+    Args:
+        count: Number of errors to reserve
+
+    Raises:
+        EsiErrorLimitExceeded: When the budget would fall below \
+            ``APPUTILS_ESI_ERROR_BUDGET_THRESHOLD``
+    """
+    try:
+        remain = cache.decr(ESI_ERROR_BUDGET_CACHE_KEY, count)
+    except ValueError:
+        return
+    if remain < APPUTILS_ESI_ERROR_BUDGET_THRESHOLD:
+        release_esi_error_budget(count)
+        reset_at = cache.get(ESI_ERROR_BUDGET_RESET_CACHE_KEY)
+        reset = max(0, int(reset_at - time())) if reset_at else 0
+        raise EsiErrorLimitExceeded(
+            retry_in=reset + int(random.uniform(1, EsiStatus.MAX_JITTER))
+        )
+
+
+def release_esi_error_budget(count: int = 1) -> None:
+    """Return reserved errors to the shared ESI error budget.
+
+    Args:
+        count: Number of errors to return
+    """
+    try:
+        cache.incr(ESI_ERROR_BUDGET_CACHE_KEY, count)
+    except ValueError:
+        pass
+
+
+@contextmanager
+def esi_error_budget(count: int = 1):
+    """Context manager for reserving errors from the shared ESI error budget.
+
+    The reserved errors are returned to the budget when the block completes
+    and kept when it raises an exception.
+
+    Args:
+        count: Number of errors to reserve
+
+    Raises:
+        EsiErrorLimitExceeded: When the budget is exhausted
+
+    Example:
+
+    .. code-block:: python
+
+        with esi_error_budget():
+            esi.client.Universe.get_universe_types_type_id(type_id=42).results()
+    """
+    reserve_esi_error_budget(count)
+    yield
+    release_esi_error_budget(count)
 
 
 def retry_task_if_esi_is_down(self):
     """Retry current celery task if ESI is not online or error threshold is exceeded.
 
+    When ESI is offline, tasks are retried after the end of the daily downtime
+    or after ``APPUTILS_ESI_OFFLINE_RETRY_DELAY`` outside of the daily downtime.
+    Retried tasks are then released one after the other with a rate ramping up to
+    ``APPUTILS_ESI_RETRY_RELEASE_RATE`` over ``APPUTILS_ESI_RETRY_RAMP_DURATION``,
+    so that they do not all hit ESI at the same time.
+
     This function has to be called from inside a celery task!
 
     Args:
         self: Current celery task from `@shared_task(bind=True)`
     """
     try:
-        fetch_esi_status().raise_for_status()
+        fetch_esi_status_cached().raise_for_status()
     except EsiOffline as ex:
-        countdown = (10 + int(random.uniform(1, 10))) * 60
+        countdown = _calc_offline_retry_countdown()
         logger.warning(
-            "ESI appears to be offline. Trying again in %d minutes.", countdown
+            "ESI appears to be offline. Trying again in %d seconds.", countdown
         )
         raise self.retry(countdown=countdown) from ex
     except EsiErrorLimitExceeded as ex:
@@ -229,3 +748,47 @@ def retry_task_if_esi_is_down(self):
             "ESI error limit threshold reached. Trying again in %s seconds", ex.retry_in
         )
         raise self.retry(countdown=ex.retry_in) from ex
+
+
+def _calc_offline_retry_countdown() -> float:
+    """Calculate countdown for retrying a task while ESI is offline.
+
+    Every task gets the next slot in a release schedule shared by all processes,
+    which starts when ESI is expected to be online again.
+    """
+    at = now()
+    downtime = _daily_downtime(at)
+    if downtime.is_in_downtime(at):
+        release_at = time() + downtime.seconds_until_up(at)
+    else:
+        cache.add(
+            ESI_RETRY_RELEASE_CACHE_KEY,
+            time() + APPUTILS_ESI_OFFLINE_RETRY_DELAY,
+            APPUTILS_ESI_OFFLINE_RETRY_DELAY,
+        )
+        release_at = cache.get(ESI_RETRY_RELEASE_CACHE_KEY) or (
+            time() + APPUTILS_ESI_OFFLINE_RETRY_DELAY
+        )
+    slots_key = f"{ESI_RETRY_RELEASE_CACHE_KEY}_{round(release_at)}_SLOTS"
+    slots_timeout = int(max(0, release_at - time())) + 3600
+    cache.add(slots_key, 0, slots_timeout)
+    try:
+        slot = cache.incr(slots_key) - 1
+    except ValueError:
+        slot = 0
+    countdown = max(0, release_at - time()) + _calc_release_offset(slot)
+    return countdown + random.uniform(0, 1 / APPUTILS_ESI_RETRY_RELEASE_RATE)
+
+
+def _calc_release_offset(slot: int) -> float:
+    """Calculate seconds after the start of the release schedule for a slot.
+
+    The release rate ramps up linearly from zero to the full rate
+    over the ramp duration and then stays at the full rate.
+    """
+    rate = APPUTILS_ESI_RETRY_RELEASE_RATE
+    ramp = APPUTILS_ESI_RETRY_RAMP_DURATION
+    slots_during_ramp = rate * ramp / 2
+    if slot < slots_during_ramp:
+        return math.sqrt(2 * ramp * slot / rate)
+    return ramp + (slot - slots_during_ramp) / rate
@@ -2,15 +2,70 @@ import hashlib
 import os
 import random
 import string
-from typing import Any, Callable
+import sys
+from bisect import bisect_right
+from collections.abc import Mapping
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List
 
 from django.core.cache import cache
 
+from . import metrics
+
 
 def chunks(lst, size):
-    """Yield successive sized chunks from lst."""
-    for i in range(0, len(lst), size):
-        yield lst[i : i + size]
+    """Yield successive sized chunks from lst.
+
+    Sequences like lists are sliced, so each chunk has the type of lst.
+    All other iterables like generators are consumed lazily
+    and yield chunks as lists, so only one chunk is kept in memory.
+
+    For large querysets please use :func:`chunked_queryset`.
+    """
+    if (
+        hasattr(lst, "__len__")
+        and hasattr(lst, "__getitem__")
+        and not isinstance(lst, Mapping)
+    ):
+        for i in range(0, len(lst), size):
+            yield lst[i : i + size]
+    else:
+        iterator = iter(lst)
+        while True:
+            chunk = list(islice(iterator, size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def chunked_queryset(queryset, size: int) -> Iterator[list]:
+    """Yield successive sized chunks of objects from a queryset.
+
+    Pages through the queryset by primary key with ``pk__gt`` instead of OFFSET,
+    so every chunk is fetched with a fast query even from very large tables.
+    The objects are returned ordered by primary key.
+
+    Args:
+        queryset: queryset of model objects
+        size: max number of objects per chunk
+
+    Example:
+
+    .. code-block:: python
+
+        for objs in chunked_queryset(EveType.objects.all(), 1000):
+            process(objs)
+    """
+    queryset = queryset.order_by("pk")
+    last_pk = None
+    while True:
+        qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        chunk = list(qs[:size])
+        if chunk:
+            yield chunk
+        if len(chunk) < size:
+            return
+        last_pk = chunk[-1].pk
 
 
 # old: get_swagger_spec_path
@@ -46,6 +101,11 @@ class AttrDict(dict):
         self.__dict__ = self
 
 
+_HUMANIZE_MAGNITUDES = ("", "k", "m", "b", "t")
+_HUMANIZE_DIVISORS = (1, 10 ** 3, 10 ** 6, 10 ** 9, 10 ** 12)
+_HUMANIZE_THRESHOLDS = _HUMANIZE_DIVISORS[1:]
+
+
 def humanize_number(value, magnitude: str = None, precision: int = 1) -> str:
     """Return the value in humanized format, e.g. `1234` becomes `1.2k`
 
@@ -54,36 +114,114 @@ def humanize_number(value, magnitude: str = None, precision: int = 1) -> str:
     - precision: number of digits to round for
     """
     value = float(value)
-    power_map = {"t": 12, "b": 9, "m": 6, "k": 3, "": 0}
-    if magnitude not in power_map:
-        if value >= 10 ** 12:
-            magnitude = "t"
-        elif value >= 10 ** 9:
-            magnitude = "b"
-        elif value >= 10 ** 6:
-            magnitude = "m"
-        elif value >= 10 ** 3:
-            magnitude = "k"
-        else:
-            magnitude = ""
-    return f"{value / 10 ** power_map[magnitude]:,.{precision}f}{magnitude}"
-
-
-def throttle(func: Callable, context_id: str, timeout: int) -> Any:
+    if magnitude in _HUMANIZE_MAGNITUDES:
+        index = _HUMANIZE_MAGNITUDES.index(magnitude)
+    else:
+        index = _magnitude_index(value)
+    return (
+        f"{value / _HUMANIZE_DIVISORS[index]:,.{precision}f}"
+        f"{_HUMANIZE_MAGNITUDES[index]}"
+    )
+
+
+def humanize_numbers(
+    values: Iterable, magnitude: str = None, precision: int = 1
+) -> List[str]:
+    """Return many values in humanized format, e.g. for rendering a table.
+
+    The result is the same as calling :func:`humanize_number` for each value,
+    but much faster for many values.
+    The magnitudes of all values are looked up in one pass.
+    When values is a NumPy array the magnitudes are looked up
+    and the values are scaled with vectorized operations.
+
+    Args:
+        values: numbers to format, e.g. a list or a NumPy array
+        magnitude: fix the magnitude to format all numbers, e.g. `"b"`
+        precision: number of digits to round for
+
+    Returns:
+        formatted numbers in the same order as values
+
+    Example:
+
+    .. code-block:: python
+
+        >>> humanize_numbers([1234, 1260000000])
+        ['1.2k', '1.3b']
+    """
+    numpy = sys.modules.get("numpy")  # only arrays of an imported NumPy are possible
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        return _humanize_numbers_array(numpy, values, magnitude, precision)
+
+    values = [float(value) for value in values]
+    if magnitude in _HUMANIZE_MAGNITUDES:
+        indexes = [_HUMANIZE_MAGNITUDES.index(magnitude)] * len(values)
+    else:
+        indexes = [_magnitude_index(value) for value in values]
+    return [
+        f"{value / _HUMANIZE_DIVISORS[index]:,.{precision}f}"
+        f"{_HUMANIZE_MAGNITUDES[index]}"
+        for value, index in zip(values, indexes)
+    ]
+
+
+def _humanize_numbers_array(numpy, values, magnitude: str, precision: int) -> List[str]:
+    values = values.astype(float).ravel()
+    if magnitude in _HUMANIZE_MAGNITUDES:
+        indexes = numpy.full(values.shape, _HUMANIZE_MAGNITUDES.index(magnitude))
+    else:
+        indexes = numpy.searchsorted(_HUMANIZE_THRESHOLDS, values, side="right")
+        indexes[numpy.isnan(values)] = 0
+    scaled = values / numpy.array(_HUMANIZE_DIVISORS, dtype=float)[indexes]
+    return [
+        f"{value:,.{precision}f}{_HUMANIZE_MAGNITUDES[index]}"
+        for value, index in zip(scaled.tolist(), indexes.tolist())
+    ]
+
+
+def _magnitude_index(value: float) -> int:
+    """Return the index of the magnitude for formatting value."""
+    if value != value:  # NaN
+        return 0
+    return bisect_right(_HUMANIZE_THRESHOLDS, value)
+
+
+def throttle(
+    func: Callable, context_id: str, timeout: int, lock_timeout: int = None
+) -> Any:
     """Call a function, but limit repeated calls with a timeout, e.g. once per day.
 
     When a repeated call falls within the timeout the call will simply be ignored.
 
+    The first call claims the timeout with a single atomic cache write
+    before func is called, so func is called only once per timeout
+    even when multiple processes call it at the same time.
+
     Args:
         func: the function to be called
         context_id: a string representing the context for applying the throttle,\
             e.g. a combination of feature name and user ID
         timeout: timeout in seconds between each repeated call of the function
+        lock_timeout: timeout in seconds between each repeated call of the function,\
+            when it should differ from the time the return value is cached
 
     Returns:
-        Return cached value of called function func
+        Return cached value of called function func.
+        Returns None while another process is still calling func.
 
     """
     hashed_id = hashlib.md5(str(context_id).encode("utf-8")).hexdigest()
     key = f"APP_UTILS_THROTTLED_{hashed_id}"
-    return cache.get_or_set(key, func, timeout)
+    lock_key = f"{key}_LOCK"
+    if not cache.add(lock_key, True, lock_timeout or timeout):
+        metrics.incr("throttle.hits")
+        return cache.get(key)
+    func = metrics.track_calls(func, "throttle")
+    try:
+        result = func()
+    except Exception:
+        cache.delete(lock_key)
+        raise
+    cache.set(key, result, timeout)
+    return result
@@ -0,0 +1,67 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from app_utils.caching import ObjectCacheMixin
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the object cache of a model, "
+        "e.g. after a deploy or after the cache was flushed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "model", help="Model to warm up the cache for, e.g. eveuniverse.EveType"
+        )
+        parser.add_argument(
+            "--manager",
+            default="objects",
+            help="Name of the model manager with the object cache",
+        )
+        parser.add_argument(
+            "--timeout", type=int, help="Timeout in seconds for cache entries"
+        )
+        parser.add_argument(
+            "--select-related", help="select_related query to be applied"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of objects fetched and stored at once",
+        )
+        parser.add_argument(
+            "--max-rate", type=float, help="Max number of objects per second"
+        )
+        parser.add_argument(
+            "--stampede-protection",
+            action="store_true",
+            help="Store entries for objects fetched with stampede protection",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options["model"])
+        except (LookupError, ValueError) as ex:
+            raise CommandError(f"Unknown model: {options['model']}") from ex
+        manager = getattr(model, options["manager"], None)
+        if not isinstance(manager, ObjectCacheMixin):
+            raise CommandError(
+                f"{model.__name__}.{options['manager']} has no object cache"
+            )
+        stats = manager.warm_cache(
+            timeout=options["timeout"],
+            select_related=options["select_related"],
+            batch_size=options["batch_size"],
+            max_rate=options["max_rate"],
+            stampede_protection=options["stampede_protection"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Stored {:,} objects in the cache in {:.1f} seconds "
+                "({:,.1f} objects/sec)".format(
+                    stats["objects"], stats["seconds"], stats["objects_per_second"]
+                )
+            )
+        )
@@ -0,0 +1,213 @@
+import bisect
+import logging
+import socket
+import threading
+from collections import Counter
+from time import perf_counter
+from typing import Callable, Dict, Optional
+
+from django.utils.module_loading import import_string
+
+from . import __title__
+from ._app_settings import APP_UTILS_METRICS_SINK
+from .logging import LoggerAddTag
+
+logger = LoggerAddTag(logging.getLogger(__name__), __title__)
+
+
+class MetricsSink:
+    """Base class for sinks receiving metrics.
+
+    Metric names are dotted paths, e.g. ``object.eveuniverse.evetype.hits``.
+    """
+
+    def incr(self, name: str, value: int = 1) -> None:
+        """Increment a counter."""
+        raise NotImplementedError()
+
+    def timing(self, name: str, seconds: float) -> None:
+        """Record a duration."""
+        raise NotImplementedError()
+
+
+class InMemorySink(MetricsSink):
+    """Collects metrics in the memory of the current process.
+
+    Durations are collected in histograms with fixed buckets.
+
+    Args:
+        buckets: Upper bounds of the histogram buckets in seconds
+    """
+
+    DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self, buckets: tuple = None) -> None:
+        self.buckets = tuple(sorted(buckets)) if buckets else self.DEFAULT_BUCKETS
+        self._counters = Counter()
+        self._timings = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def timing(self, name: str, seconds: float) -> None:
+        with self._lock:
+            try:
+                timing = self._timings[name]
+            except KeyError:
+                timing = {
+                    "count": 0,
+                    "sum": 0.0,
+                    "counts": [0] * (len(self.buckets) + 1),
+                }
+                self._timings[name] = timing
+            timing["count"] += 1
+            timing["sum"] += seconds
+            timing["counts"][bisect.bisect_left(self.buckets, seconds)] += 1
+
+    def counters(self) -> Dict[str, int]:
+        """Return all counters."""
+        with self._lock:
+            return dict(self._counters)
+
+    def timings(self) -> Dict[str, dict]:
+        """Return all histograms of durations.
+
+        Each histogram has the number of durations as ``count``,
+        their total in seconds as ``sum``
+        and the number of durations per bucket as ``buckets``,
+        with the upper bound of each bucket as key.
+        """
+        with self._lock:
+            return {
+                name: {
+                    "count": timing["count"],
+                    "sum": timing["sum"],
+                    "buckets": dict(
+                        zip(self.buckets + (float("inf"),), timing["counts"])
+                    ),
+                }
+                for name, timing in self._timings.items()
+            }
+
+    def clear(self) -> None:
+        """Remove all collected metrics."""
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+
+class LoggingSink(MetricsSink):
+    """Writes all metrics to the log with level DEBUG."""
+
+    def incr(self, name: str, value: int = 1) -> None:
+        logger.debug("Metric %s: +%d", name, value)
+
+    def timing(self, name: str, seconds: float) -> None:
+        logger.debug("Metric %s: %.3f ms", name, seconds * 1000)
+
+
+class StatsdSink(MetricsSink):
+    """Sends metrics to a statsd server via UDP.
+
+    Args:
+        host: Hostname of the statsd server
+        port: Port of the statsd server
+        prefix: Prefix added to all metric names
+    """
+
+    def __init__(
+        self, host: str = "localhost", port: int = 8125, prefix: str = "app_utils"
+    ) -> None:
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def incr(self, name: str, value: int = 1) -> None:
+        self._send(f"{self.prefix}.{name}:{value}|c")
+
+    def timing(self, name: str, seconds: float) -> None:
+        self._send(f"{self.prefix}.{name}:{seconds * 1000:.3f}|ms")
+
+    def _send(self, data: str) -> None:
+        try:
+            self._socket.sendto(data.encode("utf-8"), self.address)
+        except OSError:
+            logger.debug("Failed to send metric to statsd", exc_info=True)
+
+
+def set_metrics_sink(sink: Optional[MetricsSink]) -> None:
+    """Set the sink for all metrics. Set to None to disable metrics.
+
+    The sink can also be defined with the setting ``APP_UTILS_METRICS_SINK``.
+    """
+    global _sink
+    _sink = sink
+
+
+def get_metrics_sink() -> Optional[MetricsSink]:
+    """Return the current sink for metrics or None if metrics are disabled."""
+    return _sink
+
+
+def incr(name: str, value: int = 1) -> None:
+    """Increment a counter, if metrics are enabled."""
+    if _sink is not None:
+        _sink.incr(name, value)
+
+
+def timing(name: str, seconds: float) -> None:
+    """Record a duration, if metrics are enabled."""
+    if _sink is not None:
+        _sink.timing(name, seconds)
+
+
+def track_calls(func: Callable, name: str) -> Callable:
+    """Return func wrapped for recording misses, sets and recompute times.
+
+    Meant for functions, which are called by a cache on misses only,
+    e.g. with ``cache.get_or_set()``.
+    Returns func unchanged if metrics are disabled.
+    """
+    if _sink is None:
+        return func
+    return _TrackedCall(func, name)
+
+
+def count_hit(func: Callable, name: str) -> None:
+    """Record a hit when a function returned by :func:`track_calls` was not called."""
+    if isinstance(func, _TrackedCall) and not func.called:
+        incr(f"{name}.hits")
+
+
+class _TrackedCall:
+    def __init__(self, func: Callable, name: str) -> None:
+        self.func = func
+        self.name = name
+        self.called = False
+
+    def __call__(self, *args, **kwargs):
+        self.called = True
+        incr(f"{self.name}.misses")
+        started = perf_counter()
+        result = self.func(*args, **kwargs)
+        timing(f"{self.name}.recompute", perf_counter() - started)
+        if result is not None:
+            incr(f"{self.name}.sets")
+        return result
+
+
+def _create_sink_from_setting() -> Optional[MetricsSink]:
+    if not APP_UTILS_METRICS_SINK:
+        return None
+    try:
+        return import_string(APP_UTILS_METRICS_SINK)()
+    except ImportError:
+        logger.warning(
+            "Failed to create metrics sink: %s", APP_UTILS_METRICS_SINK, exc_info=True
+        )
+        return None
+
+
+_sink = _create_sink_from_setting()
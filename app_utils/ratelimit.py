@@ -0,0 +1,201 @@
+import functools
+import hashlib
+import math
+from time import time
+from typing import Callable
+
+from django.core.cache import cache
+
+
+class RateLimitExceeded(Exception):
+    """The rate limit has been exceeded."""
+
+    def __init__(self, retry_in: float) -> None:
+        super().__init__(f"Rate limit exceeded. Retry in {retry_in:.1f} seconds.")
+        self._retry_in = float(retry_in)
+
+    @property
+    def retry_in(self) -> float:
+        """Estimated time in seconds until the next call will be allowed."""
+        return self._retry_in
+
+
+class RateLimiter:
+    """Base class for rate limiters shared by all processes through the Django cache.
+
+    The state is only changed with the atomic cache operations ``add`` and ``incr``.
+
+    Args:
+        name: Unique name of the rate limit
+        limit: Max number of calls per period
+        period: Length of the period in seconds
+    """
+
+    def __init__(self, name: str, limit: int, period: float) -> None:
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        if period <= 0:
+            raise ValueError("period must be greater than 0")
+        self.name = str(name)
+        self.limit = int(limit)
+        self.period = float(period)
+
+    def try_acquire(self, key: str = "", count: int = 1) -> bool:
+        """Try to acquire calls without blocking.
+
+        Args:
+            key: Context of the rate limit, e.g. the ID of a user
+            count: Number of calls to acquire
+
+        Returns:
+            True if the calls were acquired, else False
+        """
+        return self._acquire(str(key), count) == 0
+
+    def acquire(self, key: str = "", count: int = 1) -> None:
+        """Acquire calls without blocking.
+
+        Args:
+            key: Context of the rate limit, e.g. the ID of a user
+            count: Number of calls to acquire
+
+        Raises:
+            RateLimitExceeded: When the calls can not be acquired
+        """
+        retry_in = self._acquire(str(key), count)
+        if retry_in:
+            raise RateLimitExceeded(retry_in)
+
+    def limited(self, key: Callable = None) -> Callable:
+        """Decorator for applying the rate limit to a function.
+
+        Calls exceeding the rate limit raise :class:`RateLimitExceeded`.
+
+        Args:
+            key: Function called with the arguments of each call,
+                which returns the context of the rate limit, e.g. the ID of a user
+
+        Example:
+
+        .. code-block:: python
+
+            notifications = SlidingWindowRateLimiter("notifications", 10, 3600)
+
+            @notifications.limited(key=lambda user, message: user.pk)
+            def notify_user(user, message):
+                ...
+        """
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                self.acquire(key(*args, **kwargs) if key else "")
+                return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def _acquire(self, key: str, count: int) -> float:
+        """Acquire calls and return 0 on success
+        or the time in seconds until they can be acquired.
+        """
+        raise NotImplementedError()
+
+    def _cache_key(self, key: str, suffix: int) -> str:
+        hashed_key = hashlib.md5(f"{self.name}_{key}".encode("utf-8")).hexdigest()
+        return f"APP_UTILS_RATELIMIT_{hashed_key}_{suffix}"
+
+
+class SlidingWindowRateLimiter(RateLimiter):
+    """Rate limiter with the sliding window counter algorithm.
+
+    Calls are counted in fixed windows of one period.
+    The number of calls in the last period is estimated from the counts
+    of the current and the previous window,
+    weighted by the overlap of the previous window with the last period.
+
+    Args:
+        name: Unique name of the rate limit
+        limit: Max number of calls per period
+        period: Length of the period in seconds
+    """
+
+    def _acquire(self, key: str, count: int) -> float:
+        now = time()
+        window = int(now // self.period)
+        elapsed = now / self.period - window
+        current_key = self._cache_key(key, window)
+        try:
+            current = cache.incr(current_key, count)
+        except ValueError:
+            cache.add(current_key, 0, math.ceil(self.period * 2))
+            current = cache.incr(current_key, count)
+        previous = cache.get(self._cache_key(key, window - 1), 0)
+        if previous * (1 - elapsed) + current <= self.limit:
+            return 0
+        cache.decr(current_key, count)
+        current -= count
+        if previous and current + count <= self.limit:
+            overlap_needed = (self.limit - current - count) / previous
+            return max((1 - overlap_needed - elapsed) * self.period, 0.001)
+        return (1 - elapsed) * self.period
+
+
+class TokenBucketRateLimiter(RateLimiter):
+    """Rate limiter with the token bucket algorithm.
+
+    The bucket holds up to ``limit`` tokens and is refilled
+    with ``limit`` tokens per period. Every call takes one token.
+    This allows bursts of up to ``limit`` calls,
+    while the average rate is limited to ``limit`` calls per period.
+
+    Only the number of tokens ever taken is stored.
+    The available tokens are derived from it and the current time.
+
+    Args:
+        name: Unique name of the rate limit
+        limit: Max number of tokens in the bucket
+        period: Time in seconds for completely refilling an empty bucket
+    """
+
+    EPOCH_PERIODS = 100
+
+    def _acquire(self, key: str, count: int) -> float:
+        rate = self.limit / self.period
+        now = time()
+        refilled = math.floor(now * rate)  # all tokens ever added to the bucket
+        full_bucket = refilled - self.limit  # tokens taken when the bucket is full
+        epoch_length = self.period * self.EPOCH_PERIODS
+        epoch = int(now // epoch_length)
+        epoch_key = self._cache_key(key, epoch)
+        try:
+            taken = cache.incr(epoch_key, count)
+        except ValueError:
+            # state is carried over from the previous epoch
+            previous = cache.get(self._cache_key(key, epoch - 1))
+            initial = full_bucket if previous is None else max(previous, full_bucket)
+            cache.add(epoch_key, initial, math.ceil(epoch_length * 2))
+            taken = cache.incr(epoch_key, count)
+        taken_before = taken - count
+        if taken_before < full_bucket:  # bucket can not hold more tokens
+            taken = self._catch_up(epoch_key, full_bucket, taken_before, count)
+        if taken <= refilled:
+            return 0
+        cache.decr(epoch_key, count)
+        return (taken - refilled) / rate
+
+    @staticmethod
+    def _catch_up(epoch_key: str, full_bucket: int, taken_before: int, count: int):
+        """Raise the tokens taken to a full bucket and return the tokens taken.
+
+        The gap is added first and the excess is then removed again,
+        so concurrent calls catching up at the same time
+        never raise the tokens taken beyond a full bucket plus their own tokens.
+        """
+        gap = full_bucket - taken_before
+        taken = cache.incr(epoch_key, gap)
+        caught_up = max(taken - gap, full_bucket) + count
+        if taken > caught_up:
+            cache.decr(epoch_key, taken - caught_up)
+        return caught_up
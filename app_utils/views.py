@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Optional
+from typing import Iterable, List, Optional
 
 from django.http import HttpResponse, JsonResponse
 from django.utils.functional import lazy
@@ -7,6 +7,8 @@ from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 
+from .helpers import humanize_numbers
+
 DEFAULT_ICON_SIZE = 32
 format_html_lazy = lazy(format_html, str)
 
@@ -188,6 +190,16 @@ def humanize_value(value: float, precision: int = 2) -> str:
     return f"{value:,.{precision}f}"
 
 
+def humanize_values(values: Iterable, precision: int = 2) -> List[str]:
+    """returns given values in human readable and abbreviated form,
+    e.g. for rendering many values in a table
+
+    Same as calling :func:`humanize_value` for each value, but much faster.
+    Values can also be a NumPy array.
+    """
+    return humanize_numbers(values, precision=precision)
+
+
 def image_html(src: str, classes: list = None, size: int = None) -> str:
     """returns the HTML for an image with optional classes and size"""
     classes_str = format_html('class="{}"', (" ".join(classes)) if classes else "")
@@ -0,0 +1,149 @@
+"""Load test for requests of the ESI status under concurrency.
+
+Starts a local stub of the ESI status endpoint and calls the status functions
+of ``esi`` from many threads and processes at the same time.
+Reports latencies, the number of requests to the stub per call,
+the number of retries and the time spent waiting between retries.
+
+Usage: python benchmarks/bench_esi_load.py --help
+"""
+import argparse
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import get_context
+from time import perf_counter
+from unittest.mock import Mock, patch
+
+from stub_esi_server import StubEsiServer
+from utils import setup_django
+
+setup_django()
+
+from django.core.cache import cache  # noqa: E402
+
+from app_utils import esi  # noqa: E402
+
+
+class _TaskRetry(Exception):
+    pass
+
+
+def _call_fetch():
+    return esi.fetch_esi_status(ignore_daily_downtime=True).is_online
+
+
+def _call_cached():
+    return esi.fetch_esi_status_cached(ignore_daily_downtime=True).is_online
+
+
+def _call_retry_task():
+    task = Mock()
+    task.retry.side_effect = _TaskRetry
+    try:
+        esi.retry_task_if_esi_is_down(task)
+    except _TaskRetry:
+        return False
+    return True
+
+
+MODES = {"fetch": _call_fetch, "cached": _call_cached, "retry-task": _call_retry_task}
+
+
+def run_process(mode: str, threads: int, calls: int, no_sleep: bool) -> list:
+    """Make calls from threads and return attempts, latency, result
+    and backoff per call.
+    """
+    local = threading.local()
+    send_request = esi._send_esi_status_request
+    sleep = esi.sleep
+
+    def counting_send_request(session):
+        local.attempts += 1
+        return send_request(session)
+
+    def counting_sleep(secs):
+        local.backoff += secs
+        if not no_sleep:
+            sleep(secs)
+
+    def run_call(_):
+        local.attempts = 0
+        local.backoff = 0
+        started = perf_counter()
+        result = MODES[mode]()
+        return local.attempts, perf_counter() - started, result, local.backoff
+
+    with patch.object(
+        esi, "_send_esi_status_request", counting_send_request
+    ), patch.object(esi, "sleep", counting_sleep):
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            return list(executor.map(run_call, range(threads * calls)))
+
+
+def percentile(values: list, pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=sorted(MODES.keys()), default="fetch")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=10, help="threads per process")
+    parser.add_argument("--calls", type=int, default=20, help="calls per thread")
+    parser.add_argument("--latency", type=float, default=0.005, help="in seconds")
+    parser.add_argument(
+        "--error-rate", type=float, default=0, help="fraction of 502/503/504 responses"
+    )
+    parser.add_argument("--error-limit-remain", type=int, default=100)
+    parser.add_argument("--error-limit-reset", type=int, default=60)
+    parser.add_argument(
+        "--no-sleep",
+        action="store_true",
+        help="skip waiting between retries, so latencies exclude the backoff",
+    )
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    server = StubEsiServer(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_limit_remain=args.error_limit_remain,
+        error_limit_reset=args.error_limit_reset,
+    )
+    cache.clear()
+    with server, patch.object(esi, "ESI_STATUS_URL", server.url):
+        started = perf_counter()
+        if args.processes > 1:
+            with get_context("fork").Pool(args.processes) as pool:
+                rows_per_process = pool.starmap(
+                    run_process,
+                    [(args.mode, args.threads, args.calls, args.no_sleep)]
+                    * args.processes,
+                )
+            results = [row for rows in rows_per_process for row in rows]
+        else:
+            results = run_process(args.mode, args.threads, args.calls, args.no_sleep)
+        duration = perf_counter() - started
+
+    attempts = [row[0] for row in results]
+    latencies = [row[1] * 1000 for row in results]
+    backoffs = [row[3] * 1000 for row in results]
+    print(f"mode:               {args.mode}")
+    print(f"calls:              {len(results)}")
+    print(f"calls/s:            {len(results) / duration:.0f}")
+    print(f"latency p50:        {percentile(latencies, 50):.2f} ms")
+    print(f"latency p99:        {percentile(latencies, 99):.2f} ms")
+    print(f"requests per call:  {server.requests_count / len(results):.3f}")
+    print(f"retries:            {sum(max(0, n - 1) for n in attempts)}")
+    print(f"backoff p50:        {percentile(backoffs, 50):.2f} ms")
+    print(f"backoff p99:        {percentile(backoffs, 99):.2f} ms")
+    print(f"backoff total:      {sum(backoffs) / 1000:.2f} s")
+    print(f"backoff slept:      {'no' if args.no_sleep else 'yes'}")
+    print(f"connections:        {server.connections_count}")
+    print(f"reported ok:        {sum(1 for row in results if row[2])}")
+
+
+if __name__ == "__main__":
+    main()
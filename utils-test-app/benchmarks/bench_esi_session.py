@@ -0,0 +1,42 @@
+"""Benchmark requests for the ESI status with and without a pooled session.
+
+Compares a new connection for every request with the connections
+re-used by the pooled session of ``esi``. The stub server speaks plain HTTP,
+so the results show the savings of TCP handshakes only.
+Savings against the real ESI are larger, because they include TLS handshakes.
+
+Usage: python benchmarks/bench_esi_session.py
+"""
+from unittest.mock import patch
+
+import requests
+from stub_esi_server import StubEsiServer
+from utils import measure_usecs, setup_django
+
+setup_django()
+
+from app_utils import esi  # noqa: E402
+
+
+def main():
+    with StubEsiServer() as server, patch.object(esi, "ESI_STATUS_URL", server.url):
+
+        def request_without_pool():
+            requests.get(server.url, timeout=(5, 30))
+
+        def request_with_pool():
+            esi._request_esi_status()
+
+        print(f"{'variant':<20} {'µs/request':>10} {'connections':>12}")
+        for name, func in {
+            "new connection": request_without_pool,
+            "pooled session": request_with_pool,
+        }.items():
+            connections_before = server.connections_count
+            usecs = measure_usecs(func, number=200, repeat=3)
+            connections = server.connections_count - connections_before
+            print(f"{name:<20} {usecs:>10.0f} {connections:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Benchmark formatting many numbers for a table with and without batch functions.
+
+Compares calling ``humanize_number`` and ``humanize_value`` for each value
+with the batch variants ``humanize_numbers`` and ``humanize_values``
+for a list and, when NumPy is installed, a NumPy array.
+
+Usage: python benchmarks/bench_humanize.py
+"""
+import random
+
+from utils import measure_usecs, setup_django
+
+setup_django()
+
+from app_utils.helpers import humanize_number, humanize_numbers  # noqa: E402
+from app_utils.views import humanize_value, humanize_values  # noqa: E402
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+ROWS = 10000
+
+
+def main():
+    random.seed(42)
+    values = [10 ** random.uniform(0, 14) for _ in range(ROWS)]
+    variants = {
+        "humanize_number": lambda: [humanize_number(value) for value in values],
+        "humanize_numbers": lambda: humanize_numbers(values),
+        "humanize_value": lambda: [humanize_value(value) for value in values],
+        "humanize_values": lambda: humanize_values(values),
+    }
+    if numpy is not None:
+        array = numpy.array(values)
+        variants["humanize_numbers numpy"] = lambda: humanize_numbers(array)
+        variants["humanize_values numpy"] = lambda: humanize_values(array)
+    print(f"{ROWS} values per call")
+    print(f"{'variant':<25} {'µs/value':>8}")
+    for name, func in variants.items():
+        usecs = measure_usecs(func, number=5) / ROWS
+        print(f"{name:<25} {usecs:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Benchmark the overhead per call of rate limiters and throttle.
+
+Measures the time for one call with the cache backend of the test project,
+i.e. Redis for the default settings. Calls are made with a limit high enough
+that every call is allowed.
+
+Usage: python benchmarks/bench_rate_limiter.py
+"""
+from utils import measure_usecs, setup_django
+
+setup_django()
+
+from django.core.cache import cache  # noqa: E402
+
+from app_utils.helpers import throttle  # noqa: E402
+from app_utils.ratelimit import (  # noqa: E402
+    SlidingWindowRateLimiter,
+    TokenBucketRateLimiter,
+)
+
+
+def main():
+    cache.clear()
+    sliding_window = SlidingWindowRateLimiter("bench", limit=10 ** 9, period=60)
+    token_bucket = TokenBucketRateLimiter("bench", limit=10 ** 9, period=60)
+    variants = {
+        "sliding window": sliding_window.try_acquire,
+        "token bucket": token_bucket.try_acquire,
+        "throttle": lambda: throttle(lambda: None, "bench", timeout=60),
+    }
+    print(f"{'variant':<20} {'µs/call':>8}")
+    for name, func in variants.items():
+        print(f"{name:<20} {measure_usecs(func, number=2000):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Benchmark serializers for cached objects against pickled model instances.
+
+Reports the size of each cache payload in bytes and the time it takes
+to rebuild an object from the payload, i.e. the cost of a cache hit
+without network latency.
+
+Usage: python benchmarks/bench_serializers.py
+"""
+import pickle
+
+from utils import measure_usecs, setup_django
+
+setup_django()
+
+from utils_test_app.models import Category, Item  # noqa: E402
+
+from app_utils.caching import (  # noqa: E402
+    CompressedFieldValuesSerializer,
+    FieldValuesSerializer,
+)
+
+
+def main():
+    category = Category(pk=1, name="Fruits")
+    item = Item(pk=42, name="Apple", category=category)
+    item._state.adding = False
+    item._state.db = "default"
+    serializers = {
+        "pickle": None,
+        "field values": FieldValuesSerializer(),
+        "compressed field values": CompressedFieldValuesSerializer(),
+    }
+    print(f"{'serializer':<25} {'bytes/object':>12} {'µs/get':>8}")
+    for name, serializer in serializers.items():
+        if serializer:
+            blob = pickle.dumps(serializer.dumps(item), pickle.HIGHEST_PROTOCOL)
+
+            def get_object():
+                return serializer.loads(Item, pickle.loads(blob), "default")
+
+        else:
+            blob = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+
+            def get_object():
+                return pickle.loads(blob)
+
+        print(f"{name:<25} {len(blob):>12} {measure_usecs(get_object):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
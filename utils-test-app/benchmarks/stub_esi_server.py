@@ -0,0 +1,111 @@
+"""Local stub of the ESI status endpoint for benchmarks.
+
+The server runs in a background thread and answers every GET request
+like the ESI status endpoint. Latency, the rate of HTTP errors
+and the error limit headers can be configured.
+
+Example:
+
+.. code-block:: python
+
+    with StubEsiServer(latency=0.005) as server:
+        requests.get(server.url)
+"""
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+
+class StubEsiServer:
+    """Stub server for the ESI status endpoint.
+
+    Args:
+        latency: Delay in seconds before each response is sent
+        error_rate: Fraction of requests, which are answered with HTTP 502, 503 or 504
+        error_limit_remain: Value of the header ``X-Esi-Error-Limit-Remain``
+        error_limit_reset: Value of the header ``X-Esi-Error-Limit-Reset``
+    """
+
+    def __init__(
+        self,
+        latency: float = 0,
+        error_rate: float = 0,
+        error_limit_remain: int = 100,
+        error_limit_reset: int = 60,
+    ) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_limit_remain = error_limit_remain
+        self.error_limit_reset = error_limit_reset
+        self.requests_count = 0
+        self.connections_count = 0
+        self._lock = threading.Lock()
+        self._server = _ThreadingHTTPServer(("127.0.0.1", 0), _create_handler(self))
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """URL of the status endpoint."""
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/latest/status/"
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubEsiServer":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def _create_handler(server: StubEsiServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # enables keep-alive
+        disable_nagle_algorithm = True  # avoids delays on kept-alive connections
+
+        def setup(self):
+            super().setup()
+            with server._lock:
+                server.connections_count += 1
+
+        def do_GET(self):
+            with server._lock:
+                server.requests_count += 1
+            if server.latency:
+                threading.Event().wait(server.latency)
+            if random.random() < server.error_rate:
+                status_code = random.choice([502, 503, 504])
+                body = b""
+            else:
+                status_code = 200
+                body = json.dumps(
+                    {
+                        "players": 12345,
+                        "server_version": "1132976",
+                        "start_time": "2017-01-02T12:34:56Z",
+                    }
+                ).encode("utf-8")
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("X-Esi-Error-Limit-Remain", str(server.error_limit_remain))
+            self.send_header("X-Esi-Error-Limit-Reset", str(server.error_limit_reset))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
@@ -0,0 +1,19 @@
+"""Shared helpers for benchmark scripts."""
+import os
+import sys
+import timeit
+from typing import Callable
+
+
+def setup_django():
+    """Setup Django with the settings of the test project."""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "testauth.settings")
+    import django
+
+    django.setup()
+
+
+def measure_usecs(func: Callable, number: int = 10000, repeat: int = 5) -> float:
+    """Return the best time per call of func in microseconds."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
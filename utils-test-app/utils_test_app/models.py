@@ -0,0 +1,26 @@
+from django.db import models
+
+from app_utils.caching import LocalCache, ObjectCacheMixin
+
+
+class CategoryManager(ObjectCacheMixin, models.Manager):
+    local_cache = LocalCache(max_entries=100, timeout=60)
+
+
+class Category(models.Model):
+    name = models.CharField(max_length=100)
+
+    objects = CategoryManager()
+
+
+class ItemManager(ObjectCacheMixin, models.Manager):
+    pass
+
+
+class Item(models.Model):
+    name = models.CharField(max_length=100)
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, null=True, default=None
+    )
+
+    objects = ItemManager()
@@ -1,11 +1,38 @@
-from unittest.mock import patch
+import datetime as dt
+import pickle
+from io import StringIO
+from time import time
+from unittest.mock import Mock, patch
 
+from django.contrib.auth.models import Group
 from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models.signals import post_delete, post_save
 from django.test import TestCase
 
-from app_utils.caching import ObjectCacheMixin
+from app_utils.caching import (
+    CachedQuerysetResult,
+    CacheTier,
+    CompressedFieldValuesSerializer,
+    FieldValuesSerializer,
+    LocalCache,
+    ObjectCacheMixin,
+    QuerysetCacheMode,
+    _ProtectedEntry,
+    acached_queryset,
+    cached,
+    cached_queryset,
+    invalidate_cached_querysets,
+    register_queryset_dependency,
+    reset_stampede_protection_stats,
+    stampede_protection_stats,
+)
+from app_utils.management.commands import app_utils_warm_cache
+
+from ..models import Category, Item, ItemManager
 
 CURRENT_PATH = "utils_test_app.tests.test_caching"
+MODULE_PATH = "app_utils.caching"
 fake_objects = dict()
 
 
@@ -72,3 +99,1394 @@ class TestObjectCacheMixin(TestCase):
 
         self.assertEqual(obj.name, "My Fake Model")
         self.assertEqual(mock_fetch_object_for_cache.call_count, 1)
+
+
+class TestObjectCacheMixinGetManyCached(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Fruits")
+        cls.item_1 = Item.objects.create(name="Apple", category=cls.category)
+        cls.item_2 = Item.objects.create(name="Banana", category=cls.category)
+        cls.item_3 = Item.objects.create(name="Cherry", category=cls.category)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_load_all_from_db_with_one_query_when_cache_is_empty(self):
+        # when
+        with self.assertNumQueries(1):
+            objs = Item.objects.get_many_cached(
+                pks=[self.item_1.pk, self.item_2.pk, self.item_3.pk]
+            )
+        # then
+        self.assertDictEqual(
+            objs,
+            {
+                self.item_1.pk: self.item_1,
+                self.item_2.pk: self.item_2,
+                self.item_3.pk: self.item_3,
+            },
+        )
+
+    def test_should_load_all_from_cache_when_cached(self):
+        # given
+        Item.objects.get_many_cached(pks=[self.item_1.pk, self.item_2.pk])
+        # when
+        with self.assertNumQueries(0):
+            objs = Item.objects.get_many_cached(pks=[self.item_1.pk, self.item_2.pk])
+        # then
+        self.assertEqual(objs[self.item_1.pk].name, "Apple")
+        self.assertEqual(objs[self.item_2.pk].name, "Banana")
+
+    def test_should_only_load_missing_objects_from_db(self):
+        # given
+        Item.objects.get_cached(pk=self.item_1.pk)
+        # when
+        with self.assertNumQueries(1):
+            objs = Item.objects.get_many_cached(pks=[self.item_1.pk, self.item_2.pk])
+        # then
+        self.assertSetEqual(set(objs.keys()), {self.item_1.pk, self.item_2.pk})
+
+    def test_should_share_cache_with_get_cached(self):
+        # given
+        Item.objects.get_many_cached(pks=[self.item_1.pk])
+        # when
+        with self.assertNumQueries(0):
+            obj = Item.objects.get_cached(pk=self.item_1.pk)
+        # then
+        self.assertEqual(obj, self.item_1)
+
+    def test_should_use_select_related(self):
+        # given
+        Item.objects.get_many_cached(pks=[self.item_1.pk], select_related="category")
+        # when
+        with self.assertNumQueries(0):
+            objs = Item.objects.get_many_cached(
+                pks=[self.item_1.pk], select_related="category"
+            )
+            category = objs[self.item_1.pk].category
+        # then
+        self.assertEqual(category, self.category)
+
+    def test_should_return_objects_keyed_by_requested_pks(self):
+        # when
+        objs = Item.objects.get_many_cached(pks=[str(self.item_1.pk)])
+        # then
+        self.assertEqual(objs[str(self.item_1.pk)], self.item_1)
+
+    def test_should_omit_missing_objects(self):
+        # when
+        objs = Item.objects.get_many_cached(pks=[self.item_1.pk, 999])
+        # then
+        self.assertSetEqual(set(objs.keys()), {self.item_1.pk})
+
+    def test_should_raise_exception_for_missing_objects_when_requested(self):
+        # when/then
+        with self.assertRaises(Item.DoesNotExist):
+            Item.objects.get_many_cached(
+                pks=[self.item_1.pk, 999], raise_if_missing=True
+            )
+
+
+class TestStampedeProtection(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.item = Item.objects.create(name="Apple")
+
+    def setUp(self) -> None:
+        cache.clear()
+        reset_stampede_protection_stats()
+        self.key = Item.objects._create_object_cache_key(self.item.pk)
+
+    def test_should_load_from_db_when_cache_is_empty(self):
+        # when
+        with self.assertNumQueries(1):
+            obj = Item.objects.get_cached(pk=self.item.pk, stampede_protection=True)
+        # then
+        self.assertEqual(obj, self.item)
+        stats = stampede_protection_stats()
+        self.assertEqual(stats["recomputes"], 1)
+        self.assertEqual(stats["hits"], 0)
+
+    def test_should_load_from_cache_when_cached(self):
+        # given
+        Item.objects.get_cached(pk=self.item.pk, timeout=60, stampede_protection=True)
+        # when
+        with self.assertNumQueries(0):
+            obj = Item.objects.get_cached(
+                pk=self.item.pk, timeout=60, stampede_protection=True
+            )
+        # then
+        self.assertEqual(obj, self.item)
+        stats = stampede_protection_stats()
+        self.assertEqual(stats["recomputes"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_should_serve_stale_entry_while_other_process_recomputes(self):
+        # given
+        cache.set(self.key, _ProtectedEntry(self.item, time() - 1, 0.01), 60)
+        cache.set(f"{self.key}_LOCK", 1, 60)
+        # when
+        with self.assertNumQueries(0):
+            obj = Item.objects.get_cached(
+                pk=self.item.pk, timeout=60, stampede_protection=True
+            )
+        # then
+        self.assertEqual(obj, self.item)
+        stats = stampede_protection_stats()
+        self.assertEqual(stats["stale_served"], 1)
+        self.assertEqual(stats["saved"], 1)
+
+    def test_should_count_fresh_entry_as_hit_while_other_process_refreshes(self):
+        # given
+        cache.set(self.key, _ProtectedEntry(self.item, time() + 10, 5), 60)
+        cache.set(f"{self.key}_LOCK", 1, 60)
+        # when
+        with patch(MODULE_PATH + ".random.random", return_value=0.99):
+            with self.assertNumQueries(0):
+                obj = Item.objects.get_cached(
+                    pk=self.item.pk, timeout=60, stampede_protection=True
+                )
+        # then
+        self.assertEqual(obj, self.item)
+        stats = stampede_protection_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["stale_served"], 0)
+        self.assertEqual(stats["saved"], 0)
+
+    def test_should_recompute_expired_entry_when_lock_is_free(self):
+        # given
+        cache.set(self.key, _ProtectedEntry(self.item, time() - 1, 0.01), 60)
+        # when
+        with self.assertNumQueries(1):
+            Item.objects.get_cached(
+                pk=self.item.pk, timeout=60, stampede_protection=True
+            )
+        # then
+        self.assertEqual(stampede_protection_stats()["recomputes"], 1)
+        self.assertGreater(cache.get(self.key).expires_at, time())
+        self.assertIsNone(cache.get(f"{self.key}_LOCK"))
+
+    def test_should_wait_for_other_process_when_entry_is_missing(self):
+        # given
+        cache.set(f"{self.key}_LOCK", 1, 60)
+
+        def other_process_stores_entry(seconds):
+            cache.set(self.key, _ProtectedEntry(self.item, time() + 60, 0.01), 60)
+
+        # when
+        with patch(MODULE_PATH + ".sleep", side_effect=other_process_stores_entry):
+            with self.assertNumQueries(0):
+                obj = Item.objects.get_cached(
+                    pk=self.item.pk, timeout=60, stampede_protection=True
+                )
+        # then
+        self.assertEqual(obj, self.item)
+        self.assertEqual(stampede_protection_stats()["waited"], 1)
+
+    @patch(MODULE_PATH + ".APP_UTILS_CACHE_STAMPEDE_WAIT_TIMEOUT", 0.1)
+    def test_should_recompute_when_waiting_for_other_process_times_out(self):
+        # given
+        cache.set(f"{self.key}_LOCK", 1, 60)
+        # when
+        with patch(MODULE_PATH + ".sleep"), self.assertNumQueries(1):
+            obj = Item.objects.get_cached(
+                pk=self.item.pk, timeout=60, stampede_protection=True
+            )
+        # then
+        self.assertEqual(obj, self.item)
+        self.assertEqual(stampede_protection_stats()["recomputes"], 1)
+
+    def test_should_refresh_entry_early_when_selected(self):
+        # given
+        cache.set(self.key, _ProtectedEntry(self.item, time() + 10, 5), 60)
+        # when
+        with patch(MODULE_PATH + ".random.random", return_value=0.99):
+            with self.assertNumQueries(1):
+                Item.objects.get_cached(
+                    pk=self.item.pk, timeout=60, stampede_protection=True
+                )
+        # then
+        stats = stampede_protection_stats()
+        self.assertEqual(stats["early_refreshes"], 1)
+        self.assertEqual(stats["recomputes"], 1)
+
+    def test_should_not_refresh_entry_early_when_not_selected(self):
+        # given
+        cache.set(self.key, _ProtectedEntry(self.item, time() + 10, 5), 60)
+        # when
+        with patch(MODULE_PATH + ".random.random", return_value=0.01):
+            with self.assertNumQueries(0):
+                Item.objects.get_cached(
+                    pk=self.item.pk, timeout=60, stampede_protection=True
+                )
+        # then
+        self.assertEqual(stampede_protection_stats()["hits"], 1)
+
+    def test_should_return_protected_entries_to_normal_calls(self):
+        # given
+        Item.objects.get_cached(pk=self.item.pk, timeout=60, stampede_protection=True)
+        # when
+        with self.assertNumQueries(0):
+            obj_1 = Item.objects.get_cached(pk=self.item.pk, timeout=60)
+            objs = Item.objects.get_many_cached(pks=[self.item.pk], timeout=60)
+        # then
+        self.assertEqual(obj_1, self.item)
+        self.assertEqual(objs[self.item.pk], self.item)
+
+    def test_should_release_lock_when_object_does_not_exist(self):
+        # when
+        with self.assertRaises(Item.DoesNotExist):
+            Item.objects.get_cached(pk=999, timeout=60, stampede_protection=True)
+        # then
+        key = Item.objects._create_object_cache_key(999)
+        self.assertIsNone(cache.get(f"{key}_LOCK"))
+
+    def test_should_cache_queryset(self):
+        # given
+        cached_queryset(
+            Item.objects.all(), key="my_key", timeout=60, stampede_protection=True
+        )
+        # when
+        with self.assertNumQueries(0):
+            result = cached_queryset(
+                Item.objects.all(), key="my_key", timeout=60, stampede_protection=True
+            )
+            names = [obj.name for obj in result]
+        # then
+        self.assertListEqual(names, ["Apple"])
+        self.assertEqual(stampede_protection_stats()["hits"], 1)
+
+
+class TestLocalCache(TestCase):
+    def test_should_return_stored_value(self):
+        # given
+        local_cache = LocalCache()
+        local_cache.set("alpha", "dummy")
+        # when/then
+        self.assertEqual(local_cache.get("alpha"), "dummy")
+
+    def test_should_return_default_when_not_found(self):
+        # given
+        local_cache = LocalCache()
+        # when/then
+        self.assertEqual(local_cache.get("alpha", "default"), "default")
+
+    def test_should_not_return_expired_entry(self):
+        # given
+        local_cache = LocalCache(timeout=10)
+        with patch(MODULE_PATH + ".monotonic", return_value=1000):
+            local_cache.set("alpha", "dummy")
+        # when
+        with patch(MODULE_PATH + ".monotonic", return_value=1011):
+            result = local_cache.get("alpha")
+        # then
+        self.assertIsNone(result)
+        self.assertEqual(len(local_cache), 0)
+
+    def test_should_use_custom_timeout_for_entry(self):
+        # given
+        local_cache = LocalCache(timeout=10)
+        with patch(MODULE_PATH + ".monotonic", return_value=1000):
+            local_cache.set("alpha", "dummy", timeout=20)
+        # when
+        with patch(MODULE_PATH + ".monotonic", return_value=1011):
+            result = local_cache.get("alpha")
+        # then
+        self.assertEqual(result, "dummy")
+
+    def test_should_evict_least_recently_used_entry_when_full(self):
+        # given
+        local_cache = LocalCache(max_entries=2)
+        local_cache.set("alpha", 1)
+        local_cache.set("bravo", 2)
+        local_cache.get("alpha")
+        # when
+        local_cache.set("charlie", 3)
+        # then
+        self.assertEqual(local_cache.get("alpha"), 1)
+        self.assertIsNone(local_cache.get("bravo"))
+        self.assertEqual(local_cache.get("charlie"), 3)
+        self.assertEqual(local_cache.stats()["evictions"], 1)
+
+    def test_should_evict_entries_when_max_bytes_exceeded(self):
+        # given
+        local_cache = LocalCache(max_bytes=300)
+        local_cache.set("alpha", "x" * 100)
+        local_cache.set("bravo", "x" * 100)
+        # when
+        local_cache.set("charlie", "x" * 100)
+        # then
+        self.assertIsNone(local_cache.get("alpha"))
+        self.assertEqual(local_cache.get("charlie"), "x" * 100)
+        self.assertLessEqual(local_cache.stats()["bytes"], 300)
+
+    def test_should_not_store_values_larger_than_max_bytes(self):
+        # given
+        local_cache = LocalCache(max_bytes=100)
+        # when
+        local_cache.set("alpha", "x" * 200)
+        # then
+        self.assertIsNone(local_cache.get("alpha"))
+
+    def test_should_delete_all_entries_of_a_group(self):
+        # given
+        local_cache = LocalCache()
+        local_cache.set("alpha-1", 1, group="alpha")
+        local_cache.set("alpha-2", 2, group="alpha")
+        local_cache.set("bravo-1", 3, group="bravo")
+        # when
+        local_cache.delete_group("alpha")
+        # then
+        self.assertIsNone(local_cache.get("alpha-1"))
+        self.assertIsNone(local_cache.get("alpha-2"))
+        self.assertEqual(local_cache.get("bravo-1"), 3)
+
+    def test_should_count_hits_and_misses(self):
+        # given
+        local_cache = LocalCache()
+        local_cache.set("alpha", 1)
+        # when
+        local_cache.get("alpha")
+        local_cache.get("alpha")
+        local_cache.get("bravo")
+        # then
+        stats = local_cache.stats()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["entries"], 1)
+
+
+class TestObjectCacheMixinWithLocalCache(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Fruits")
+
+    def setUp(self) -> None:
+        cache.clear()
+        Category.objects.local_cache.clear()
+
+    def test_should_load_from_local_cache_when_cached(self):
+        # given
+        Category.objects.get_cached(pk=self.category.pk)
+        cache.clear()
+        # when
+        with self.assertNumQueries(0):
+            obj = Category.objects.get_cached(pk=self.category.pk)
+        # then
+        self.assertEqual(obj, self.category)
+
+    def test_should_load_from_django_cache_when_not_in_local_cache(self):
+        # given
+        Category.objects.get_cached(pk=self.category.pk)
+        Category.objects.local_cache.clear()
+        # when
+        with self.assertNumQueries(0):
+            obj = Category.objects.get_cached(pk=self.category.pk)
+        # then
+        self.assertEqual(obj, self.category)
+
+    def test_should_fill_local_cache_from_get_many_cached(self):
+        # given
+        Category.objects.get_many_cached(pks=[self.category.pk])
+        cache.clear()
+        # when
+        with self.assertNumQueries(0):
+            objs = Category.objects.get_many_cached(pks=[self.category.pk])
+        # then
+        self.assertEqual(objs[self.category.pk], self.category)
+
+    def test_should_return_new_instance_from_local_cache(self):
+        # given
+        obj_1 = Category.objects.get_cached(pk=self.category.pk)
+        # when
+        obj_1.name = "changed"
+        with self.assertNumQueries(0):
+            obj_2 = Category.objects.get_cached(pk=self.category.pk)
+            objs = Category.objects.get_many_cached(pks=[self.category.pk])
+        # then
+        self.assertIsNot(obj_1, obj_2)
+        self.assertEqual(obj_2.name, "Fruits")
+        self.assertEqual(objs[self.category.pk].name, "Fruits")
+
+    def test_should_invalidate_all_variants_in_local_cache_when_saved(self):
+        # given
+        Category.objects.get_cached(pk=self.category.pk)
+        key = Category.objects._create_object_cache_key(self.category.pk, "dummy")
+        Category.objects._set_local_cache(key, self.category, 60)
+        # when
+        self.category.save()
+        # then
+        self.assertEqual(len(Category.objects.local_cache), 0)
+
+    def test_should_invalidate_local_cache_when_deleted(self):
+        # given
+        category = Category.objects.create(name="Vegetables")
+        Category.objects.get_cached(pk=category.pk)
+        # when
+        category.delete()
+        # then
+        self.assertEqual(len(Category.objects.local_cache), 0)
+
+
+class TestObjectCacheMixinInvalidation(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Fruits")
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.item = Item.objects.create(name="Apple", category=self.category)
+
+    def test_should_invalidate_all_variants_when_saved(self):
+        # given
+        Item.objects.get_cached(pk=self.item.pk, timeout=3600)
+        Item.objects.get_cached(
+            pk=self.item.pk, timeout=3600, select_related="category"
+        )
+        # when
+        self.item.name = "Banana"
+        self.item.save()
+        # then
+        with self.assertNumQueries(2):
+            obj_1 = Item.objects.get_cached(pk=self.item.pk, timeout=3600)
+            obj_2 = Item.objects.get_cached(
+                pk=self.item.pk, timeout=3600, select_related="category"
+            )
+        self.assertEqual(obj_1.name, "Banana")
+        self.assertEqual(obj_2.name, "Banana")
+
+    def test_should_invalidate_variants_cached_with_get_many_cached(self):
+        # given
+        Item.objects.get_many_cached(
+            pks=[self.item.pk], timeout=3600, select_related="category"
+        )
+        # when
+        self.item.name = "Banana"
+        self.item.save()
+        # then
+        objs = Item.objects.get_many_cached(
+            pks=[self.item.pk], timeout=3600, select_related="category"
+        )
+        self.assertEqual(objs[self.item.pk].name, "Banana")
+
+    def test_should_invalidate_variants_after_generation_was_evicted(self):
+        # given
+        Item.objects.get_cached(
+            pk=self.item.pk, timeout=None, select_related="category"
+        )
+        cache.delete(Item.objects._create_generation_cache_key(self.item.pk))
+        # when
+        self.item.name = "Banana"
+        self.item.save()
+        obj = Item.objects.get_cached(
+            pk=self.item.pk, timeout=None, select_related="category"
+        )
+        # then
+        self.assertEqual(obj.name, "Banana")
+
+    def test_should_create_generations_of_many_objects_in_bulk(self):
+        # given
+        pks = [self.item.pk] + [
+            Item.objects.create(name=f"Item {num}").pk for num in range(9)
+        ]
+        cache.clear()
+        # when
+        with patch(MODULE_PATH + ".cache", wraps=cache) as spy_cache:
+            Item.objects.get_many_cached(
+                pks=pks, timeout=3600, select_related="category"
+            )
+        # then
+        self.assertFalse(spy_cache.add.called)
+        self.assertFalse(spy_cache.get.called)
+        self.assertEqual(spy_cache.get_many.call_count, 3)
+        self.assertEqual(spy_cache.set_many.call_count, 2)
+        generation_key = Item.objects._create_generation_cache_key(self.item.pk)
+        self.assertEqual(spy_cache.set_many.call_args_list[0][0][1], 24 * 3600)
+        self.assertIn(generation_key, spy_cache.set_many.call_args_list[0][0][0])
+
+    def test_should_invalidate_with_one_cache_request(self):
+        # given
+        Item.objects.get_cached(
+            pk=self.item.pk, timeout=3600, select_related="category"
+        )
+        # when
+        with patch(MODULE_PATH + ".cache", wraps=cache) as spy_cache:
+            Item.objects.invalidate_cached(self.item.pk)
+        # then
+        self.assertEqual(spy_cache.delete_many.call_count, 1)
+        self.assertFalse(spy_cache.get.called)
+        self.assertFalse(spy_cache.get_many.called)
+
+    def test_should_invalidate_when_deleted(self):
+        # given
+        pk = self.item.pk
+        Item.objects.get_cached(pk=pk, timeout=3600)
+        # when
+        self.item.delete()
+        # then
+        with self.assertRaises(Item.DoesNotExist):
+            Item.objects.get_cached(pk=pk, timeout=3600)
+
+    def test_should_invalidate_again_after_commit(self):
+        # when
+        with patch(MODULE_PATH + ".transaction.on_commit") as mock_on_commit:
+            self.item.save()
+        # then
+        self.assertTrue(mock_on_commit.called)
+
+    def test_should_not_affect_other_objects(self):
+        # given
+        other_item = Item.objects.create(name="Cherry")
+        Item.objects.get_cached(pk=other_item.pk, timeout=3600)
+        # when
+        self.item.save()
+        # then
+        with self.assertNumQueries(0):
+            Item.objects.get_cached(pk=other_item.pk, timeout=3600)
+
+    def test_should_not_invalidate_when_disabled(self):
+        # given
+        Item.objects.get_cached(pk=self.item.pk, timeout=3600)
+        # when
+        with patch.object(ItemManager, "cache_invalidation", False):
+            self.item.save()
+        # then
+        with self.assertNumQueries(0):
+            Item.objects.get_cached(pk=self.item.pk, timeout=3600)
+
+
+class TestCachedQueryset(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Fruits")
+        cls.item_1 = Item.objects.create(name="Cherry", category=cls.category)
+        cls.item_2 = Item.objects.create(name="Apple", category=cls.category)
+        cls.item_3 = Item.objects.create(name="Banana")
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_cache_queryset(self):
+        # given
+        cached_queryset(Item.objects.order_by("name"), key="my_key", timeout=60)
+        # when
+        with self.assertNumQueries(0):
+            result = cached_queryset(
+                Item.objects.order_by("name"), key="my_key", timeout=60
+            )
+            names = [obj.name for obj in result]
+        # then
+        self.assertListEqual(names, ["Apple", "Banana", "Cherry"])
+
+    def test_should_cache_values_and_rebuild_objects_without_query(self):
+        # given
+        cached_queryset(
+            Item.objects.order_by("name"),
+            key="my_key",
+            timeout=60,
+            mode=QuerysetCacheMode.VALUES,
+        )
+        # when
+        with self.assertNumQueries(0):
+            result = cached_queryset(
+                Item.objects.order_by("name"),
+                key="my_key",
+                timeout=60,
+                mode=QuerysetCacheMode.VALUES,
+            )
+        # then
+        self.assertIsInstance(result, CachedQuerysetResult)
+        self.assertListEqual(result, [self.item_2, self.item_3, self.item_1])
+        self.assertEqual(result[0].name, "Apple")
+        self.assertEqual(result[0].category_id, self.category.pk)
+        self.assertFalse(result[0]._state.adding)
+        self.assertGreater(result.payload_size, 0)
+
+    def test_should_not_rebuild_objects_from_values_of_other_fields(self):
+        # given
+        cached_queryset(
+            Item.objects.order_by("name"),
+            key="my_key",
+            timeout=60,
+            mode=QuerysetCacheMode.VALUES,
+        )
+        payload = cache.get("my_key")
+        cache.set(  # as stored before a field "legacy" was removed
+            "my_key",
+            payload._replace(
+                fields=("legacy",) + payload.fields,
+                rows=[("legacy-value",) + row for row in payload.rows],
+            ),
+        )
+        # when
+        result = cached_queryset(
+            Item.objects.order_by("name"),
+            key="my_key",
+            timeout=60,
+            mode=QuerysetCacheMode.VALUES,
+        )
+        # then
+        self.assertListEqual(
+            [obj.name for obj in result], ["Apple", "Banana", "Cherry"]
+        )
+        self.assertEqual(result[0].category_id, self.category.pk)
+        self.assertEqual(cache.get("my_key").fields, payload.fields)
+
+    def test_should_cache_pks_and_rebuild_objects_with_one_query(self):
+        # given
+        cached_queryset(
+            Item.objects.order_by("name"), key="my_key", timeout=60, mode="pks"
+        )
+        # when
+        with self.assertNumQueries(1):
+            result = cached_queryset(
+                Item.objects.order_by("name"), key="my_key", timeout=60, mode="pks"
+            )
+        # then
+        self.assertListEqual(result, [self.item_2, self.item_3, self.item_1])
+        self.assertGreater(result.payload_size, 0)
+
+    def test_should_omit_deleted_objects_when_rebuilding_from_pks(self):
+        # given
+        item = Item.objects.create(name="Dragonfruit")
+        cached_queryset(
+            Item.objects.order_by("name"), key="my_key", timeout=60, mode="pks"
+        )
+        item.delete()
+        # when
+        result = cached_queryset(
+            Item.objects.order_by("name"), key="my_key", timeout=60, mode="pks"
+        )
+        # then
+        self.assertListEqual(result, [self.item_2, self.item_3, self.item_1])
+
+    def test_should_store_smaller_payload_than_queryset(self):
+        # given
+        qs = Item.objects.order_by("name")
+        cached_queryset(qs, key="key_queryset", timeout=60)
+        queryset_size = len(pickle.dumps(cache.get("key_queryset")))
+        # when
+        result = cached_queryset(
+            qs, key="key_values", timeout=60, mode=QuerysetCacheMode.VALUES
+        )
+        # then
+        self.assertLess(result.payload_size, queryset_size)
+
+    def test_should_work_with_stampede_protection(self):
+        # given
+        cached_queryset(
+            Item.objects.order_by("name"),
+            key="my_key",
+            timeout=60,
+            mode=QuerysetCacheMode.VALUES,
+            stampede_protection=True,
+        )
+        # when
+        with self.assertNumQueries(0):
+            result = cached_queryset(
+                Item.objects.order_by("name"),
+                key="my_key",
+                timeout=60,
+                mode=QuerysetCacheMode.VALUES,
+                stampede_protection=True,
+            )
+        # then
+        self.assertListEqual(result, [self.item_2, self.item_3, self.item_1])
+
+    def test_should_raise_error_for_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            cached_queryset(Item.objects.all(), key="my_key", timeout=60, mode="xx")
+
+
+class TestFieldValuesSerializer(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Fruits")
+        cls.item = Item.objects.create(name="Apple", category=cls.category)
+
+    def test_should_rebuild_object(self):
+        # given
+        serializer = FieldValuesSerializer()
+        # when
+        data = serializer.dumps(Item.objects.get(pk=self.item.pk))
+        obj = serializer.loads(Item, data, "default")
+        # then
+        self.assertIsInstance(data, tuple)
+        self.assertEqual(obj, self.item)
+        self.assertEqual(obj.name, "Apple")
+        self.assertEqual(obj.category_id, self.category.pk)
+        self.assertFalse(obj._state.adding)
+        self.assertEqual(obj._state.db, "default")
+
+    def test_should_rebuild_related_objects(self):
+        # given
+        serializer = FieldValuesSerializer()
+        item = Item.objects.select_related("category").get(pk=self.item.pk)
+        # when
+        obj = serializer.loads(Item, serializer.dumps(item), "default")
+        # then
+        with self.assertNumQueries(0):
+            self.assertEqual(obj.category.name, "Fruits")
+
+    def test_should_rebuild_empty_related_objects(self):
+        # given
+        serializer = FieldValuesSerializer()
+        item = Item.objects.create(name="Banana")
+        item = Item.objects.select_related("category").get(pk=item.pk)
+        # when
+        obj = serializer.loads(Item, serializer.dumps(item), "default")
+        # then
+        with self.assertNumQueries(0):
+            self.assertIsNone(obj.category)
+
+    def test_should_be_smaller_than_pickled_object(self):
+        # given
+        serializer = FieldValuesSerializer()
+        item = Item.objects.get(pk=self.item.pk)
+        # when
+        data = serializer.dumps(item)
+        # then
+        self.assertLess(len(pickle.dumps(data)), len(pickle.dumps(item)))
+
+    def test_should_rebuild_object_from_compressed_data(self):
+        # given
+        serializer = CompressedFieldValuesSerializer()
+        item = Item.objects.select_related("category").get(pk=self.item.pk)
+        # when
+        data = serializer.dumps(item)
+        obj = serializer.loads(Item, data, "default")
+        # then
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(obj, self.item)
+        with self.assertNumQueries(0):
+            self.assertEqual(obj.category.name, "Fruits")
+
+    def test_should_not_load_payload_after_field_was_removed(self):
+        # given
+        serializer = FieldValuesSerializer()
+        schema, values, related = serializer.dumps(Item.objects.get(pk=self.item.pk))
+        data = (schema + 1, ("legacy-value",) + values, related)
+        # when
+        obj = serializer.loads(Item, data, "default")
+        # then
+        self.assertIsNone(obj)
+
+    def test_should_not_load_payload_without_fields_hash(self):
+        # given
+        serializer = FieldValuesSerializer()
+        _, values, related = serializer.dumps(Item.objects.get(pk=self.item.pk))
+        # when
+        obj = serializer.loads(Item, (values[:-1], related), "default")
+        # then
+        self.assertIsNone(obj)
+
+    def test_should_not_load_payload_with_outdated_related_object(self):
+        # given
+        serializer = FieldValuesSerializer()
+        item = Item.objects.select_related("category").get(pk=self.item.pk)
+        (
+            schema,
+            values,
+            ((name, (rel_schema, rel_values, rel_related)),),
+        ) = serializer.dumps(item)
+        data = (schema, values, ((name, (rel_schema + 1, rel_values, rel_related)),))
+        # when
+        obj = serializer.loads(Item, data, "default")
+        # then
+        self.assertIsNone(obj)
+
+
+@patch.object(ItemManager, "cache_serializer", FieldValuesSerializer())
+class TestObjectCacheMixinWithSerializer(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Fruits")
+        cls.item = Item.objects.create(name="Apple", category=cls.category)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_store_serialized_object_with_get_cached(self):
+        # given
+        Item.objects.get_cached(pk=self.item.pk, select_related="category")
+        # when
+        with self.assertNumQueries(0):
+            obj = Item.objects.get_cached(pk=self.item.pk, select_related="category")
+            category_name = obj.category.name
+        # then
+        key = Item.objects._create_django_cache_keys([self.item.pk], "category")[
+            self.item.pk
+        ]
+        self.assertIsInstance(cache.get(key), tuple)
+        self.assertEqual(obj, self.item)
+        self.assertEqual(category_name, "Fruits")
+
+    def test_should_store_serialized_object_with_stampede_protection(self):
+        # given
+        Item.objects.get_cached(pk=self.item.pk, stampede_protection=True)
+        # when
+        with self.assertNumQueries(0):
+            obj = Item.objects.get_cached(pk=self.item.pk, stampede_protection=True)
+        # then
+        self.assertEqual(obj, self.item)
+
+    def test_should_store_serialized_objects_with_get_many_cached(self):
+        # given
+        Item.objects.get_many_cached(pks=[self.item.pk])
+        # when
+        with self.assertNumQueries(0):
+            objs = Item.objects.get_many_cached(pks=[self.item.pk])
+        # then
+        key = Item.objects._create_object_cache_key(self.item.pk)
+        self.assertIsInstance(cache.get(key), tuple)
+        self.assertEqual(objs[self.item.pk], self.item)
+
+    def test_should_replace_outdated_payload_with_get_cached(self):
+        # given
+        key = Item.objects._create_object_cache_key(self.item.pk)
+        schema, values, related = FieldValuesSerializer().dumps(self.item)
+        cache.set(key, (schema + 1, values[1:], related))
+        # when
+        obj = Item.objects.get_cached(pk=self.item.pk)
+        # then
+        self.assertEqual(obj.name, "Apple")
+        self.assertEqual(cache.get(key)[0], schema)
+
+    def test_should_replace_outdated_payload_with_get_many_cached(self):
+        # given
+        key = Item.objects._create_object_cache_key(self.item.pk)
+        schema, values, related = FieldValuesSerializer().dumps(self.item)
+        cache.set(key, (schema + 1, values[1:], related))
+        # when
+        objs = Item.objects.get_many_cached(pks=[self.item.pk])
+        # then
+        self.assertEqual(objs[self.item.pk].name, "Apple")
+        self.assertEqual(cache.get(key)[0], schema)
+
+    def test_should_return_objects_cached_without_serializer(self):
+        # given
+        key = Item.objects._create_object_cache_key(self.item.pk)
+        cache.set(key, Item.objects.get(pk=self.item.pk))
+        # when
+        with self.assertNumQueries(0):
+            obj = Item.objects.get_cached(pk=self.item.pk)
+        # then
+        self.assertEqual(obj, self.item)
+
+
+class TestCachedQuerysetDependsOn(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Fruits")
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.item = Item.objects.create(name="Apple")
+
+    def fetch_names(self):
+        return [
+            obj.name
+            for obj in cached_queryset(
+                Item.objects.order_by("name"),
+                key="my_key",
+                timeout=3600,
+                mode=QuerysetCacheMode.VALUES,
+                depends_on=[Item],
+            )
+        ]
+
+    def test_should_return_cached_queryset(self):
+        # given
+        self.fetch_names()
+        # when
+        with self.assertNumQueries(0):
+            names = self.fetch_names()
+        # then
+        self.assertListEqual(names, ["Apple"])
+
+    def test_should_invalidate_when_object_is_created(self):
+        # given
+        self.fetch_names()
+        # when
+        Item.objects.create(name="Banana")
+        # then
+        self.assertListEqual(self.fetch_names(), ["Apple", "Banana"])
+
+    def test_should_invalidate_when_object_is_deleted(self):
+        # given
+        self.fetch_names()
+        # when
+        self.item.delete()
+        # then
+        self.assertListEqual(self.fetch_names(), [])
+
+    def test_should_invalidate_when_requested(self):
+        # given
+        self.fetch_names()
+        # when
+        invalidate_cached_querysets(Item)
+        # then
+        with self.assertNumQueries(1):
+            self.fetch_names()
+
+    def test_should_not_invalidate_when_other_model_changed(self):
+        # given
+        self.fetch_names()
+        # when
+        self.category.save()
+        # then
+        with self.assertNumQueries(0):
+            self.fetch_names()
+
+    @patch(MODULE_PATH + ".time", lambda: 1000.0)
+    def test_should_not_reuse_old_generation_when_counter_was_lost(self):
+        # given
+        cache.clear()
+        self.fetch_names()
+        Item.objects.create(name="Banana")
+        cache.delete("APP_UTILS_GENERATION_utils_test_app_item")
+        # when
+        names = self.fetch_names()
+        # then
+        self.assertListEqual(names, ["Apple", "Banana"])
+
+    def test_should_invalidate_querysets_of_other_models(self):
+        # given
+        cached_queryset(
+            Category.objects.all(), key="my_key", timeout=3600, depends_on=[Category]
+        )
+        # when
+        Category.objects.create(name="Vegetables")
+        # then
+        with self.assertNumQueries(1):
+            result = cached_queryset(
+                Category.objects.all(),
+                key="my_key",
+                timeout=3600,
+                depends_on=[Category],
+            )
+            self.assertEqual(len(result), 2)
+
+    @patch(MODULE_PATH + "._queryset_dependencies", set())
+    def test_should_invalidate_querysets_of_registered_models(self):
+        # given
+        dispatch_uid = "app_utils_queryset_invalidation_APP_UTILS_GENERATION_auth_group"
+        post_save.disconnect(sender=Group, dispatch_uid=dispatch_uid)
+        post_delete.disconnect(sender=Group, dispatch_uid=dispatch_uid)
+        register_queryset_dependency(Group)
+        generation_key = "APP_UTILS_GENERATION_auth_group"
+        cache.set(generation_key, 1, None)
+        # when
+        Group.objects.create(name="Dummy")
+        # then
+        self.assertEqual(cache.get(generation_key), 2)
+
+    @patch(MODULE_PATH + "._queryset_dependencies", set())
+    def test_should_connect_signals_only_once_per_model(self):
+        # given
+        register_queryset_dependency(Item)
+        # when
+        with patch(MODULE_PATH + ".post_save.connect") as mock_connect:
+            register_queryset_dependency(Item)
+            cached_queryset(
+                Item.objects.all(), key="my_key", timeout=3600, depends_on=[Item]
+            )
+        # then
+        self.assertFalse(mock_connect.called)
+
+
+class TestAsyncVariants(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Fruits")
+        cls.item_1 = Item.objects.create(name="Apple", category=cls.category)
+        cls.item_2 = Item.objects.create(name="Banana")
+
+    def setUp(self) -> None:
+        cache.clear()
+        Category.objects.local_cache.clear()
+
+    async def test_should_get_cached_object(self):
+        # when
+        obj = await Item.objects.aget_cached(pk=self.item_1.pk, timeout=60)
+        # then
+        self.assertEqual(obj, self.item_1)
+        key = Item.objects._create_object_cache_key(self.item_1.pk)
+        self.assertEqual(cache.get(key), self.item_1)
+
+    async def test_should_get_cached_object_with_select_related(self):
+        # when
+        obj = await Item.objects.aget_cached(
+            pk=self.item_1.pk, timeout=60, select_related="category"
+        )
+        # then
+        self.assertEqual(obj.category, self.category)
+
+    async def test_should_raise_exception_when_object_does_not_exist(self):
+        with self.assertRaises(Item.DoesNotExist):
+            await Item.objects.aget_cached(pk=999, timeout=60)
+
+    async def test_should_get_object_from_local_cache_without_thread_switch(self):
+        # given
+        key = Category.objects._create_object_cache_key(self.category.pk)
+        Category.objects._set_local_cache(key, self.category, 60)
+        # when
+        with patch(MODULE_PATH + ".sync_to_async") as mock_sync_to_async:
+            obj = await Category.objects.aget_cached(pk=self.category.pk, timeout=60)
+        # then
+        self.assertEqual(obj, self.category)
+        self.assertFalse(mock_sync_to_async.called)
+
+    async def test_should_get_many_cached_objects(self):
+        # when
+        objs = await Item.objects.aget_many_cached(
+            pks=(pk for pk in [self.item_1.pk, self.item_2.pk]), timeout=60
+        )
+        # then
+        self.assertDictEqual(
+            objs, {self.item_1.pk: self.item_1, self.item_2.pk: self.item_2}
+        )
+
+    async def test_should_return_evaluated_queryset(self):
+        # when
+        result = await acached_queryset(
+            Item.objects.order_by("name"), key="my_key", timeout=60
+        )
+        # then
+        self.assertListEqual([obj.name for obj in result], ["Apple", "Banana"])
+
+    async def test_should_return_cached_values(self):
+        # when
+        result = await acached_queryset(
+            Item.objects.order_by("name"),
+            key="my_key",
+            timeout=60,
+            mode=QuerysetCacheMode.VALUES,
+            depends_on=[Item],
+        )
+        # then
+        self.assertListEqual(result, [self.item_1, self.item_2])
+
+
+class TestWarmCache(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Fruits")
+        cls.items = [
+            Item.objects.create(name=f"Item {num}", category=cls.category)
+            for num in range(5)
+        ]
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_store_all_objects_in_cache(self):
+        # when
+        stats = Item.objects.warm_cache(timeout=60, batch_size=2)
+        # then
+        self.assertEqual(stats["objects"], 5)
+        self.assertGreaterEqual(stats["objects_per_second"], 0)
+        with self.assertNumQueries(0):
+            objs = Item.objects.get_many_cached(pks=[obj.pk for obj in self.items])
+        self.assertEqual(len(objs), 5)
+
+    def test_should_store_objects_in_batches(self):
+        # when
+        with patch("app_utils.caching.cache.set_many") as mock_set_many:
+            Item.objects.warm_cache(timeout=60, batch_size=2)
+        # then
+        self.assertEqual(mock_set_many.call_count, 3)
+
+    def test_should_store_objects_with_select_related(self):
+        # when
+        Item.objects.warm_cache(timeout=60, select_related="category")
+        # then
+        with self.assertNumQueries(0):
+            obj = Item.objects.get_cached(
+                pk=self.items[0].pk, timeout=60, select_related="category"
+            )
+            self.assertEqual(obj.category, self.category)
+
+    def test_should_store_objects_of_queryset_only(self):
+        # when
+        stats = Item.objects.warm_cache(
+            timeout=60, queryset=Item.objects.filter(name="Item 1")
+        )
+        # then
+        self.assertEqual(stats["objects"], 1)
+
+    def test_should_store_objects_for_stampede_protection(self):
+        # given
+        reset_stampede_protection_stats()
+        Item.objects.warm_cache(timeout=60, stampede_protection=True)
+        # when
+        with self.assertNumQueries(0):
+            obj = Item.objects.get_cached(
+                pk=self.items[0].pk, timeout=60, stampede_protection=True
+            )
+        # then
+        self.assertEqual(obj, self.items[0])
+        stats = stampede_protection_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["recomputes"], 0)
+
+    def test_should_store_objects_for_stampede_protection_without_timeout(self):
+        # given
+        Item.objects.warm_cache(stampede_protection=True)
+        # when
+        with self.assertNumQueries(0):
+            obj = Item.objects.get_cached(
+                pk=self.items[0].pk, timeout=None, stampede_protection=True
+            )
+        # then
+        self.assertEqual(obj, self.items[0])
+
+    def test_should_limit_rate(self):
+        # when
+        with patch(MODULE_PATH + ".sleep") as mock_sleep:
+            Item.objects.warm_cache(timeout=60, batch_size=2, max_rate=1)
+        # then
+        self.assertEqual(mock_sleep.call_count, 2)
+        args, _ = mock_sleep.call_args
+        self.assertGreater(args[0], 1)
+
+
+class TestWarmCacheCommand(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.item = Item.objects.create(name="Apple")
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_warm_cache(self):
+        # given
+        out = StringIO()
+        # when
+        call_command(
+            app_utils_warm_cache.Command(),
+            "utils_test_app.Item",
+            "--timeout",
+            "60",
+            stdout=out,
+        )
+        # then
+        self.assertIn("Stored 1 objects", out.getvalue())
+        with self.assertNumQueries(0):
+            Item.objects.get_cached(pk=self.item.pk)
+
+    def test_should_warm_cache_with_stampede_protection(self):
+        # when
+        call_command(
+            app_utils_warm_cache.Command(),
+            "utils_test_app.Item",
+            "--timeout",
+            "60",
+            "--stampede-protection",
+            stdout=StringIO(),
+        )
+        # then
+        with self.assertNumQueries(0):
+            Item.objects.get_cached(pk=self.item.pk, stampede_protection=True)
+
+    def test_should_raise_error_for_unknown_model(self):
+        with self.assertRaises(CommandError):
+            call_command(
+                app_utils_warm_cache.Command(),
+                "utils_test_app.Unknown",
+                stdout=StringIO(),
+            )
+
+    def test_should_raise_error_for_model_without_object_cache(self):
+        with self.assertRaises(CommandError):
+            call_command(app_utils_warm_cache.Command(), "auth.User", stdout=StringIO())
+
+
+class TestCachedDecorator(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_cache_return_value_in_django_cache(self):
+        # given
+        spy = Mock(return_value="dummy")
+
+        @cached(timeout=60)
+        def my_func(a, b=1):
+            return spy(a, b)
+
+        # when
+        result_1 = my_func(1, b=2)
+        result_2 = my_func(1, b=2)
+        # then
+        self.assertEqual(result_1, "dummy")
+        self.assertEqual(result_2, "dummy")
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual(my_func.stats(), {"hits": 1, "misses": 1, "entries": 0})
+
+    def test_should_cache_per_arguments(self):
+        # given
+        spy = Mock(side_effect=lambda x: x * 2)
+
+        @cached(timeout=60)
+        def my_func(x):
+            return spy(x)
+
+        # when
+        results = [my_func(1), my_func(2), my_func(1)]
+        # then
+        self.assertEqual(results, [2, 4, 2])
+        self.assertEqual(spy.call_count, 2)
+
+    def test_should_cache_none(self):
+        # given
+        spy = Mock(return_value=None)
+
+        @cached(timeout=60)
+        def my_func():
+            return spy()
+
+        # when
+        my_func()
+        my_func()
+        # then
+        self.assertEqual(spy.call_count, 1)
+
+    def test_should_use_custom_key(self):
+        # given
+        spy = Mock(return_value="dummy")
+
+        @cached(timeout=60, key=lambda user_id, verbose: user_id)
+        def my_func(user_id, verbose):
+            return spy()
+
+        # when
+        my_func(1, True)
+        my_func(1, False)
+        # then
+        self.assertEqual(spy.call_count, 1)
+
+    def test_should_cache_in_local_cache_only(self):
+        # given
+        spy = Mock(return_value="dummy")
+
+        @cached(timeout=60, tier=CacheTier.LOCAL)
+        def my_func():
+            return spy()
+
+        # when
+        with patch(MODULE_PATH + ".cache") as mock_cache:
+            my_func()
+            my_func()
+        # then
+        self.assertEqual(spy.call_count, 1)
+        self.assertFalse(mock_cache.get.called)
+        self.assertFalse(mock_cache.set.called)
+        self.assertEqual(my_func.stats()["entries"], 1)
+
+    def test_should_fill_local_cache_from_django_cache(self):
+        # given
+        @cached(timeout=60, tier=CacheTier.DJANGO)
+        def my_func():
+            return "dummy"
+
+        my_func()
+        spy = Mock(return_value="other")
+
+        @cached(timeout=60, tier=CacheTier.BOTH)
+        def my_func():  # noqa: F811
+            return spy()
+
+        # when
+        result_1 = my_func()
+        with patch(MODULE_PATH + ".cache") as mock_cache:
+            result_2 = my_func()
+        # then
+        self.assertEqual(result_1, "dummy")
+        self.assertEqual(result_2, "dummy")
+        self.assertFalse(spy.called)
+        self.assertFalse(mock_cache.get.called)
+
+    def test_should_invalidate_cached_value(self):
+        # given
+        spy = Mock(return_value="dummy")
+
+        @cached(timeout=60, tier=CacheTier.BOTH)
+        def my_func(x):
+            return spy()
+
+        my_func(1)
+        # when
+        my_func.invalidate(1)
+        my_func(1)
+        # then
+        self.assertEqual(spy.call_count, 2)
+
+    @patch.object(Item, "__str__", lambda obj: obj.name)
+    def test_should_cache_per_object_for_objects_with_same_string(self):
+        # given
+        item_1 = Item.objects.create(name="Apple")
+        item_2 = Item.objects.create(name="Apple")
+
+        @cached(timeout=60)
+        def my_func(item):
+            return item.pk
+
+        # when
+        results = [my_func(item_1), my_func(item_2)]
+        # then
+        self.assertEqual(results, [item_1.pk, item_2.pk])
+
+    def test_should_create_stable_keys_for_supported_arguments(self):
+        # given
+        category = Category.objects.create(name="Fruits")
+        spy = Mock(return_value="dummy")
+
+        @cached(timeout=60)
+        def my_func(*args, **kwargs):
+            return spy()
+
+        args = (1, "1", 1.5, None, [category, (True,)], dt.date(2021, 7, 1))
+        # when
+        my_func(*args, mode=CacheTier.LOCAL)
+        my_func(*args, mode=CacheTier.LOCAL)
+        my_func(*args, mode=CacheTier.BOTH)
+        # then
+        self.assertEqual(spy.call_count, 2)
+
+    def test_should_raise_error_for_arguments_without_stable_key(self):
+        # given
+        @cached(timeout=60)
+        def my_func(obj):
+            return "dummy"
+
+        # when/then
+        with self.assertRaises(TypeError):
+            my_func(object())
+        with self.assertRaises(TypeError):
+            my_func(Item(name="unsaved"))
+
+    def test_should_keep_function_name(self):
+        # given
+        @cached(timeout=60)
+        def my_func():
+            pass
+
+        # then
+        self.assertEqual(my_func.__name__, "my_func")
+
+    async def test_should_cache_coroutine_function(self):
+        # given
+        spy = Mock(return_value="dummy")
+
+        @cached(timeout=60)
+        async def my_func(x):
+            return spy(x)
+
+        # when
+        result_1 = await my_func(1)
+        result_2 = await my_func(1)
+        # then
+        self.assertEqual(result_1, "dummy")
+        self.assertEqual(result_2, "dummy")
+        self.assertEqual(spy.call_count, 1)
@@ -1,17 +1,32 @@
 import datetime as dt
 from unittest.mock import Mock, patch
 
+import requests
 import requests_mock
 from celery.exceptions import Retry as CeleryRetry
 
+from django.core.cache import cache
 from django.test import TestCase
 
 from app_utils.esi import (
+    DailyDowntime,
     EsiErrorLimitExceeded,
     EsiOffline,
     EsiStatus,
+    _calc_release_offset,
+    _esi_session,
+    afetch_esi_status,
+    daily_downtime,
+    esi_circuit_breaker_state,
+    esi_error_budget,
+    esi_response_hook,
     fetch_esi_status,
+    fetch_esi_status_cached,
+    record_esi_response,
+    release_esi_error_budget,
+    reserve_esi_error_budget,
     retry_task_if_esi_is_down,
+    update_esi_error_budget,
 )
 
 MODULE_PATH = "app_utils.esi"
@@ -88,6 +103,41 @@ class TestEsiStatus(TestCase):
         obj = EsiStatus(True, error_limit_remain=10)
         self.assertFalse(obj.is_error_limit_exceeded)
 
+    @patch(MODULE_PATH + ".APPUTILS_ESI_ERROR_LIMIT_THRESHOLD", 25)
+    def test_is_error_limit_exceeded_when_no_errors_remain(self):
+        obj = EsiStatus(True, error_limit_remain=0, error_limit_reset=60)
+        self.assertTrue(obj.is_error_limit_exceeded)
+        self.assertFalse(obj.is_ok)
+
+    @patch(MODULE_PATH + ".APPUTILS_ESI_ERROR_LIMIT_THRESHOLD", 25)
+    def test_retry_in_when_error_limit_exceeded(self):
+        obj = EsiStatus(True, error_limit_remain=10, error_limit_reset=60)
+        self.assertEqual(obj.retry_in, 60)
+
+    @patch(MODULE_PATH + ".APPUTILS_ESI_ERROR_LIMIT_THRESHOLD", 25)
+    def test_retry_in_when_ok(self):
+        obj = EsiStatus(True, error_limit_remain=99, error_limit_reset=60)
+        self.assertEqual(obj.retry_in, 0)
+
+    def test_should_be_immutable(self):
+        obj = EsiStatus(True, error_limit_remain=99, error_limit_reset=60)
+        with self.assertRaises(AttributeError):
+            obj.is_online = False
+        with self.assertRaises(AttributeError):
+            obj.other = 1
+
+    def test_should_convert_to_and_from_tuple(self):
+        # given
+        obj = EsiStatus(True, error_limit_remain=99, error_limit_reset=60)
+        # when
+        values = obj.to_tuple()
+        obj_2 = EsiStatus.from_tuple(values)
+        # then
+        self.assertEqual(values, (True, 99, 60))
+        self.assertTrue(obj_2.is_online)
+        self.assertEqual(obj_2.error_limit_remain, 99)
+        self.assertEqual(obj_2.error_limit_reset, 60)
+
     @patch(MODULE_PATH + ".EsiStatus.MAX_JITTER", 20)
     def test_error_limit_reset_w_jitter_1(self):
         obj = EsiStatus(True, error_limit_remain=30, error_limit_reset=20)
@@ -127,8 +177,107 @@ class TestEsiStatus(TestCase):
             obj.raise_for_status()
 
 
+class TestDailyDowntime(TestCase):
+    def test_should_report_downtime(self):
+        # given
+        downtime = DailyDowntime(dt.date(2021, 6, 29), [(11.0, 11.25)])
+        # when/then
+        self.assertFalse(downtime.is_in_downtime(dt.datetime(2021, 6, 29, 10, 59)))
+        self.assertTrue(downtime.is_in_downtime(dt.datetime(2021, 6, 29, 11, 0)))
+        self.assertTrue(downtime.is_in_downtime(dt.datetime(2021, 6, 29, 11, 15)))
+        self.assertFalse(downtime.is_in_downtime(dt.datetime(2021, 6, 29, 11, 16)))
+
+    def test_should_report_seconds_until_up(self):
+        # given
+        downtime = DailyDowntime(dt.date(2021, 6, 29), [(11.0, 11.25)])
+        # when/then
+        self.assertEqual(
+            downtime.seconds_until_up(dt.datetime(2021, 6, 29, 11, 5)), 600
+        )
+        self.assertEqual(downtime.seconds_until_up(dt.datetime(2021, 6, 29, 12, 0)), 0)
+
+    def test_should_support_downtime_wrapping_past_midnight(self):
+        # given
+        downtime = DailyDowntime(dt.date(2021, 6, 29), [(23.5, 0.5)])
+        # when/then
+        self.assertTrue(downtime.is_in_downtime(dt.datetime(2021, 6, 29, 0, 15)))
+        self.assertFalse(downtime.is_in_downtime(dt.datetime(2021, 6, 29, 12, 0)))
+        self.assertTrue(downtime.is_in_downtime(dt.datetime(2021, 6, 29, 23, 45)))
+        self.assertEqual(
+            downtime.seconds_until_up(dt.datetime(2021, 6, 29, 23, 45)), 2700
+        )
+
+    def test_should_support_multiple_downtimes(self):
+        # given
+        downtime = DailyDowntime(dt.date(2021, 6, 29), [(11.0, 11.25), (18.0, 19.0)])
+        # when/then
+        self.assertTrue(downtime.is_in_downtime(dt.datetime(2021, 6, 29, 11, 5)))
+        self.assertFalse(downtime.is_in_downtime(dt.datetime(2021, 6, 29, 15, 0)))
+        self.assertTrue(downtime.is_in_downtime(dt.datetime(2021, 6, 29, 18, 30)))
+
+    def test_should_merge_overlapping_downtimes(self):
+        # given
+        downtime = DailyDowntime(dt.date(2021, 6, 29), [(11.0, 11.25), (11.0, 12.0)])
+        # when
+        result = downtime.seconds_until_up(dt.datetime(2021, 6, 29, 11, 10))
+        # then
+        self.assertEqual(result, 3000)
+
+    def test_should_support_timezone_aware_datetimes(self):
+        # given
+        downtime = DailyDowntime(dt.date(2021, 6, 29), [(11.0, 11.25)], dt.timezone.utc)
+        # when
+        result = downtime.is_in_downtime(
+            dt.datetime(2021, 6, 29, 11, 5, tzinfo=dt.timezone.utc)
+        )
+        # then
+        self.assertTrue(result)
+
+
+@patch(MODULE_PATH + ".APPUTILS_ESI_DAILY_DOWNTIMES", None)
+@patch(MODULE_PATH + ".APPUTILS_ESI_DAILY_DOWNTIME_START", 11.0)
+@patch(MODULE_PATH + ".APPUTILS_ESI_DAILY_DOWNTIME_END", 11.25)
+class TestDailyDowntimeFromSettings(TestCase):
+    def test_should_create_downtime_from_settings(self):
+        # when
+        with patch(MODULE_PATH + ".now") as mock_now:
+            mock_now.return_value = dt.datetime(2021, 6, 29, 11, 5)
+            downtime = daily_downtime()
+        # then
+        self.assertEqual(downtime.windows, ((11.0, 11.25),))
+        self.assertTrue(downtime.is_in_downtime(dt.datetime(2021, 6, 29, 11, 5)))
+
+    def test_should_create_downtime_once_per_day(self):
+        # given
+        with patch(MODULE_PATH + ".now") as mock_now:
+            mock_now.return_value = dt.datetime(2021, 6, 29, 10, 0)
+            downtime_1 = daily_downtime()
+            # when
+            mock_now.return_value = dt.datetime(2021, 6, 29, 12, 0)
+            downtime_2 = daily_downtime()
+            mock_now.return_value = dt.datetime(2021, 6, 30, 10, 0)
+            downtime_3 = daily_downtime()
+        # then
+        self.assertIs(downtime_1, downtime_2)
+        self.assertIsNot(downtime_1, downtime_3)
+
+    def test_should_create_multiple_downtimes_from_settings(self):
+        # when
+        with patch(MODULE_PATH + ".now") as mock_now, patch(
+            MODULE_PATH + ".APPUTILS_ESI_DAILY_DOWNTIMES",
+            [(11.0, 11.25), (23.5, 0.5)],
+        ):
+            mock_now.return_value = dt.datetime(2021, 6, 29, 10, 0)
+            downtime = daily_downtime()
+        # then
+        self.assertEqual(downtime.windows, ((11.0, 11.25), (23.5, 0.5)))
+
+
 @requests_mock.Mocker()
 class TestFetchEsiStatus(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
     @patch(MODULE_PATH + ".APPUTILS_ESI_DAILY_DOWNTIME_START", 11.0)
     @patch(MODULE_PATH + ".APPUTILS_ESI_DAILY_DOWNTIME_END", 11.25)
     def test_normal(self, requests_mocker):
@@ -309,6 +458,19 @@ class TestFetchEsiStatus(TestCase):
         self.assertEqual(requests_mocker.call_count, 1)
         self.assertFalse(status.is_online)
 
+    def test_should_report_offline_on_network_error(self, requests_mocker):
+        # given
+        requests_mocker.register_uri(
+            "GET",
+            url="https://esi.evetech.net/latest/status/",
+            exc=requests.exceptions.ConnectionError,
+        )
+        # when
+        status = fetch_esi_status(ignore_daily_downtime=True)
+        # then
+        self.assertFalse(status.is_online)
+        self.assertIsNone(status.error_limit_remain)
+
     @patch(MODULE_PATH + ".APPUTILS_ESI_DAILY_DOWNTIME_START", 11.0)
     @patch(MODULE_PATH + ".APPUTILS_ESI_DAILY_DOWNTIME_END", 11.25)
     def test_should_report_offline_during_esi_downtime_1(self, requests_mocker):
@@ -347,8 +509,494 @@ class TestFetchEsiStatus(TestCase):
         self.assertTrue(status.is_online)
 
 
+class TestAFetchEsiStatus(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    async def test_should_report_status(self):
+        # given
+        with requests_mock.Mocker() as requests_mocker:
+            requests_mocker.register_uri(
+                "GET",
+                url="https://esi.evetech.net/latest/status/",
+                headers={
+                    "X-Esi-Error-Limit-Remain": "40",
+                    "X-Esi-Error-Limit-Reset": "30",
+                },
+                json={"players": 12345},
+            )
+            # when
+            status = await afetch_esi_status(ignore_daily_downtime=True)
+        # then
+        self.assertTrue(status.is_online)
+        self.assertEqual(status.error_limit_remain, 40)
+        self.assertEqual(status.error_limit_reset, 30)
+
+    async def test_should_retry_without_blocking(self):
+        # given
+        with requests_mock.Mocker() as requests_mocker:
+            requests_mocker.register_uri(
+                "GET",
+                "https://esi.evetech.net/latest/status/",
+                [
+                    {"status_code": 503},
+                    {"status_code": 200, "json": {"players": 12345}},
+                ],
+            )
+            # when
+            with patch(MODULE_PATH + ".asyncio.sleep") as mock_sleep, patch(
+                MODULE_PATH + ".sleep"
+            ) as mock_blocking_sleep:
+                mock_sleep.side_effect = _async_noop
+                status = await afetch_esi_status(ignore_daily_downtime=True)
+        # then
+        self.assertTrue(status.is_online)
+        self.assertEqual(requests_mocker.call_count, 2)
+        self.assertEqual(mock_sleep.call_count, 1)
+        self.assertFalse(mock_blocking_sleep.called)
+
+    async def test_should_report_offline_during_esi_downtime(self):
+        # when
+        with requests_mock.Mocker() as requests_mocker, patch(
+            MODULE_PATH + "._is_daily_downtime", lambda: True
+        ):
+            status = await afetch_esi_status()
+        # then
+        self.assertFalse(status.is_online)
+        self.assertFalse(requests_mocker.called)
+
+
+async def _async_noop(*args, **kwargs):
+    pass
+
+
+@patch(MODULE_PATH + ".APPUTILS_ESI_CIRCUIT_BREAKER_THRESHOLD", 2)
+@patch(MODULE_PATH + ".APPUTILS_ESI_CIRCUIT_BREAKER_COOLDOWN", 60)
+@patch(MODULE_PATH + ".sleep", lambda x: None)
+@requests_mock.Mocker()
+class TestEsiCircuitBreaker(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_open_after_consecutive_failures(self, requests_mocker):
+        # given
+        requests_mocker.register_uri(
+            "GET", url="https://esi.evetech.net/latest/status/", status_code=502
+        )
+        # when
+        for _ in range(3):
+            status = fetch_esi_status(ignore_daily_downtime=True)
+        # then
+        self.assertFalse(status.is_online)
+        self.assertEqual(requests_mocker.call_count, 8)  # 2 x 4 tries
+        self.assertEqual(esi_circuit_breaker_state(), "open")
+
+    def test_should_stay_closed_when_requests_succeed(self, requests_mocker):
+        # given
+        requests_mocker.register_uri(
+            "GET",
+            "https://esi.evetech.net/latest/status/",
+            [
+                {"status_code": 502},
+                {"status_code": 502},
+                {"status_code": 502},
+                {"status_code": 502},
+                {"status_code": 200, "json": {"players": 12345}},
+            ],
+        )
+        # when
+        fetch_esi_status(ignore_daily_downtime=True)
+        fetch_esi_status(ignore_daily_downtime=True)
+        # then
+        self.assertEqual(esi_circuit_breaker_state(), "closed")
+        self.assertIsNone(cache.get("APP_UTILS_ESI_BREAKER_FAILURES"))
+
+    def test_should_let_single_probe_through_when_half_open(self, requests_mocker):
+        # given
+        requests_mocker.register_uri(
+            "GET",
+            url="https://esi.evetech.net/latest/status/",
+            json={"players": 12345},
+        )
+        cache.set("APP_UTILS_ESI_BREAKER_FAILURES", 2)
+        cache.add("APP_UTILS_ESI_BREAKER_PROBE", 1)  # other process is probing
+        # when
+        status = fetch_esi_status(ignore_daily_downtime=True)
+        # then
+        self.assertEqual(esi_circuit_breaker_state(), "half-open")
+        self.assertFalse(status.is_online)
+        self.assertFalse(requests_mocker.called)
+
+    def test_should_close_after_successful_probe(self, requests_mocker):
+        # given
+        requests_mocker.register_uri(
+            "GET",
+            url="https://esi.evetech.net/latest/status/",
+            json={"players": 12345},
+        )
+        cache.set("APP_UTILS_ESI_BREAKER_FAILURES", 2)
+        # when
+        status = fetch_esi_status(ignore_daily_downtime=True)
+        # then
+        self.assertTrue(status.is_online)
+        self.assertEqual(requests_mocker.call_count, 1)
+        self.assertEqual(esi_circuit_breaker_state(), "closed")
+
+    def test_should_open_again_after_failed_probe(self, requests_mocker):
+        # given
+        requests_mocker.register_uri(
+            "GET", url="https://esi.evetech.net/latest/status/", status_code=502
+        )
+        cache.set("APP_UTILS_ESI_BREAKER_FAILURES", 2)
+        # when
+        fetch_esi_status(ignore_daily_downtime=True)
+        # then
+        self.assertEqual(esi_circuit_breaker_state(), "open")
+        self.assertIsNone(cache.get("APP_UTILS_ESI_BREAKER_PROBE"))
+
+
+@patch(MODULE_PATH + "._session", None)
+@patch(MODULE_PATH + "._session_pid", None)
+class TestEsiSession(TestCase):
+    def test_should_reuse_session_within_process(self):
+        # when
+        session_1 = _esi_session()
+        session_2 = _esi_session()
+        # then
+        self.assertIs(session_1, session_2)
+
+    @patch(MODULE_PATH + ".APPUTILS_ESI_HTTP_POOL_MAXSIZE", 7)
+    def test_should_create_session_with_pool_size_from_settings(self):
+        # when
+        session = _esi_session()
+        # then
+        adapter = session.get_adapter("https://esi.evetech.net/latest/status/")
+        self.assertEqual(adapter._pool_maxsize, 7)
+
+    def test_should_create_new_session_after_fork(self):
+        # given
+        session_1 = _esi_session()
+        # when
+        with patch(MODULE_PATH + ".os.getpid", lambda: -1):
+            session_2 = _esi_session()
+        # then
+        self.assertIsNot(session_1, session_2)
+
+
+@patch(MODULE_PATH + "._is_daily_downtime", lambda: False)
+@patch(MODULE_PATH + "._fetch_esi_status_from_esi")
+class TestFetchEsiStatusCached(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_fetch_status_when_not_cached(self, mock_fetch):
+        # given
+        mock_fetch.return_value = EsiStatus(True, 99, 60)
+        # when
+        status = fetch_esi_status_cached()
+        # then
+        self.assertEqual(mock_fetch.call_count, 1)
+        self.assertTrue(status.is_online)
+        self.assertEqual(status.error_limit_remain, 99)
+        self.assertEqual(status.error_limit_reset, 60)
+
+    def test_should_return_cached_status_with_unchanged_remain(self, mock_fetch):
+        # given
+        mock_fetch.return_value = EsiStatus(True, 99, 60)
+        fetch_esi_status_cached()
+        # when
+        status_1 = fetch_esi_status_cached()
+        status_2 = fetch_esi_status_cached()
+        # then
+        self.assertEqual(mock_fetch.call_count, 1)
+        self.assertTrue(status_2.is_online)
+        self.assertEqual(status_1.error_limit_remain, 99)
+        self.assertEqual(status_2.error_limit_remain, 99)
+
+    def test_should_not_exceed_error_limit_from_many_reads(self, mock_fetch):
+        # given
+        mock_fetch.return_value = EsiStatus(True, 100, 60)
+        # when
+        statuses = [fetch_esi_status_cached() for _ in range(200)]
+        # then
+        self.assertFalse(any(status.is_error_limit_exceeded for status in statuses))
+
+    def test_should_adjust_reset_by_age_of_cached_status(self, mock_fetch):
+        # given
+        mock_fetch.return_value = EsiStatus(True, 99, 60)
+        with patch(MODULE_PATH + ".time", lambda: 1000.0):
+            fetch_esi_status_cached()
+        # when
+        with patch(MODULE_PATH + ".time", lambda: 1025.0):
+            status = fetch_esi_status_cached()
+        # then
+        self.assertEqual(status.error_limit_reset, 35)
+
+    def test_should_return_cached_status_without_error_limits(self, mock_fetch):
+        # given
+        mock_fetch.return_value = EsiStatus(False)
+        fetch_esi_status_cached()
+        # when
+        status = fetch_esi_status_cached()
+        # then
+        self.assertEqual(mock_fetch.call_count, 1)
+        self.assertFalse(status.is_online)
+        self.assertIsNone(status.error_limit_remain)
+        self.assertIsNone(status.error_limit_reset)
+
+    @patch(MODULE_PATH + ".ESI_STATUS_WAIT_TIMEOUT", 0.3)
+    @patch(MODULE_PATH + ".sleep", Mock())
+    def test_should_wait_for_status_while_other_process_fetches(self, mock_fetch):
+        # given
+        mock_fetch.return_value = EsiStatus(True, 99, 60)
+        cache.add("APP_UTILS_ESI_STATUS_LOCK", 1, 10)
+        responses = iter([None, None, (True, 50, 30, 0.0)])
+
+        def my_cache_get(key):
+            return next(responses)
+
+        # when
+        with patch(MODULE_PATH + ".cache.get", my_cache_get):
+            status = fetch_esi_status_cached()
+        # then
+        self.assertFalse(mock_fetch.called)
+        self.assertTrue(status.is_online)
+
+    @patch(MODULE_PATH + ".ESI_STATUS_WAIT_TIMEOUT", 0)
+    def test_should_fetch_itself_when_waiting_timed_out(self, mock_fetch):
+        # given
+        mock_fetch.return_value = EsiStatus(True, 99, 60)
+        cache.add("APP_UTILS_ESI_STATUS_LOCK", 1, 10)
+        # when
+        status = fetch_esi_status_cached()
+        # then
+        self.assertEqual(mock_fetch.call_count, 1)
+        self.assertEqual(status.error_limit_remain, 99)
+
+    def test_should_report_offline_during_daily_downtime(self, mock_fetch):
+        # when
+        with patch(MODULE_PATH + "._is_daily_downtime", lambda: True):
+            status = fetch_esi_status_cached()
+        # then
+        self.assertFalse(mock_fetch.called)
+        self.assertFalse(status.is_online)
+
+
+@patch(MODULE_PATH + "._is_daily_downtime", lambda: False)
+@patch(MODULE_PATH + "._fetch_esi_status_from_esi")
+class TestRecordEsiResponse(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_update_shared_status(self, mock_fetch):
+        # given
+        response = Mock(
+            status_code=200,
+            headers={"X-Esi-Error-Limit-Remain": "80", "X-Esi-Error-Limit-Reset": "20"},
+        )
+        # when
+        record_esi_response(response)
+        # then
+        status = fetch_esi_status_cached()
+        self.assertFalse(mock_fetch.called)
+        self.assertTrue(status.is_online)
+        self.assertEqual(status.error_limit_remain, 80)
+        self.assertEqual(status.error_limit_reset, 20)
+        self.assertEqual(cache.get("APP_UTILS_ESI_ERROR_BUDGET"), 80)
+
+    def test_should_accept_headers_in_any_case(self, mock_fetch):
+        # given
+        response = Mock(
+            status_code=404,
+            headers={"x-esi-error-limit-remain": "80", "x-esi-error-limit-reset": "20"},
+        )
+        # when
+        record_esi_response(response)
+        # then
+        status = fetch_esi_status_cached()
+        self.assertFalse(mock_fetch.called)
+        self.assertTrue(status.is_online)
+
+    def test_should_ignore_response_without_headers(self, mock_fetch):
+        # given
+        mock_fetch.return_value = EsiStatus(True, 99, 60)
+        response = Mock(status_code=200, headers={})
+        # when
+        record_esi_response(response)
+        # then
+        fetch_esi_status_cached()
+        self.assertTrue(mock_fetch.called)
+
+    def test_should_keep_online_state_on_server_errors(self, mock_fetch):
+        # given
+        cache.set("APP_UTILS_ESI_STATUS", (False, 50, 30, 0.0))
+        response = Mock(
+            status_code=502,
+            headers={"X-Esi-Error-Limit-Remain": "80", "X-Esi-Error-Limit-Reset": "20"},
+        )
+        # when
+        record_esi_response(response)
+        # then
+        status = fetch_esi_status_cached()
+        self.assertFalse(status.is_online)
+        self.assertEqual(status.error_limit_reset, 20)
+
+    def test_should_not_create_status_from_server_errors(self, mock_fetch):
+        # given
+        mock_fetch.return_value = EsiStatus(True, 99, 60)
+        response = Mock(
+            status_code=503,
+            headers={"X-Esi-Error-Limit-Remain": "80", "X-Esi-Error-Limit-Reset": "20"},
+        )
+        # when
+        record_esi_response(response)
+        # then
+        fetch_esi_status_cached()
+        self.assertTrue(mock_fetch.called)
+        self.assertEqual(cache.get("APP_UTILS_ESI_ERROR_BUDGET"), 80)
+
+    def test_should_record_responses_with_requests_hook(self, mock_fetch):
+        # given
+        session = requests.Session()
+        session.hooks["response"].append(esi_response_hook)
+        # when
+        with requests_mock.Mocker(session=session) as requests_mocker:
+            requests_mocker.register_uri(
+                "GET",
+                url="https://esi.evetech.net/latest/universe/types/42/",
+                headers={
+                    "X-Esi-Error-Limit-Remain": "80",
+                    "X-Esi-Error-Limit-Reset": "20",
+                },
+                json={"type_id": 42},
+            )
+            session.get("https://esi.evetech.net/latest/universe/types/42/")
+        # then
+        status = fetch_esi_status_cached()
+        self.assertFalse(mock_fetch.called)
+        self.assertEqual(status.error_limit_remain, 80)
+
+
+@patch(MODULE_PATH + ".APPUTILS_ESI_ERROR_BUDGET_THRESHOLD", 5)
+class TestEsiErrorBudget(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_reserve_from_budget(self):
+        # given
+        update_esi_error_budget(remain=10, reset=60)
+        # when
+        reserve_esi_error_budget(3)
+        # then
+        self.assertEqual(cache.get("APP_UTILS_ESI_ERROR_BUDGET"), 7)
+
+    def test_should_raise_when_budget_is_exhausted(self):
+        # given
+        update_esi_error_budget(remain=6, reset=60)
+        reserve_esi_error_budget()
+        # when
+        with patch(MODULE_PATH + ".EsiStatus.MAX_JITTER", 1):
+            with self.assertRaises(EsiErrorLimitExceeded) as cm:
+                reserve_esi_error_budget()
+        # then
+        self.assertEqual(cache.get("APP_UTILS_ESI_ERROR_BUDGET"), 5)
+        self.assertGreaterEqual(cm.exception.retry_in, 59)
+        self.assertLessEqual(cm.exception.retry_in, 61)
+
+    def test_should_allow_reservation_when_budget_is_unknown(self):
+        # when
+        reserve_esi_error_budget()
+        # then
+        self.assertIsNone(cache.get("APP_UTILS_ESI_ERROR_BUDGET"))
+
+    def test_should_release_reserved_errors(self):
+        # given
+        update_esi_error_budget(remain=10, reset=60)
+        reserve_esi_error_budget(2)
+        # when
+        release_esi_error_budget(2)
+        # then
+        self.assertEqual(cache.get("APP_UTILS_ESI_ERROR_BUDGET"), 10)
+
+    def test_should_lower_budget_when_esi_reports_less_remain(self):
+        # given
+        update_esi_error_budget(remain=50, reset=60)
+        # when
+        update_esi_error_budget(remain=40, reset=50)
+        # then
+        self.assertEqual(cache.get("APP_UTILS_ESI_ERROR_BUDGET"), 40)
+
+    def test_should_not_raise_budget_when_esi_reports_more_remain(self):
+        # given
+        update_esi_error_budget(remain=50, reset=60)
+        reserve_esi_error_budget(20)
+        # when
+        update_esi_error_budget(remain=45, reset=50)
+        # then
+        self.assertEqual(cache.get("APP_UTILS_ESI_ERROR_BUDGET"), 30)
+
+    def test_should_ignore_headers_at_window_boundary(self):
+        # when
+        update_esi_error_budget(remain=50, reset=0)
+        # then
+        self.assertIsNone(cache.get("APP_UTILS_ESI_ERROR_BUDGET"))
+
+    def test_context_manager_should_release_errors_on_success(self):
+        # given
+        update_esi_error_budget(remain=10, reset=60)
+        # when
+        with esi_error_budget(2):
+            self.assertEqual(cache.get("APP_UTILS_ESI_ERROR_BUDGET"), 8)
+        # then
+        self.assertEqual(cache.get("APP_UTILS_ESI_ERROR_BUDGET"), 10)
+
+    def test_context_manager_should_keep_errors_on_exception(self):
+        # given
+        update_esi_error_budget(remain=10, reset=60)
+        # when
+        with self.assertRaises(RuntimeError):
+            with esi_error_budget(2):
+                raise RuntimeError()
+        # then
+        self.assertEqual(cache.get("APP_UTILS_ESI_ERROR_BUDGET"), 8)
+
+    @requests_mock.Mocker()
+    def test_should_seed_budget_from_esi_status(self, requests_mocker):
+        # given
+        requests_mocker.register_uri(
+            "GET",
+            url="https://esi.evetech.net/latest/status/",
+            headers={
+                "X-Esi-Error-Limit-Remain": "40",
+                "X-Esi-Error-Limit-Reset": "30",
+            },
+            json={"players": 12345},
+        )
+        # when
+        fetch_esi_status(ignore_daily_downtime=True)
+        # then
+        self.assertEqual(cache.get("APP_UTILS_ESI_ERROR_BUDGET"), 40)
+
+
+@patch(MODULE_PATH + ".APPUTILS_ESI_RETRY_RELEASE_RATE", 5)
+@patch(MODULE_PATH + ".APPUTILS_ESI_RETRY_RAMP_DURATION", 120)
+class TestCalcReleaseOffset(TestCase):
+    def test_should_start_release_immediately(self):
+        self.assertEqual(_calc_release_offset(0), 0)
+
+    def test_should_ramp_up_release_rate(self):
+        self.assertAlmostEqual(_calc_release_offset(75), 60)
+        self.assertAlmostEqual(_calc_release_offset(300), 120)
+
+    def test_should_release_with_full_rate_after_ramp(self):
+        self.assertAlmostEqual(_calc_release_offset(305), 121)
+
+
 class TestRetryTaskIfEsiIsDown(TestCase):
-    @patch(MODULE_PATH + ".fetch_esi_status", lambda: EsiStatus(True, 99, 60))
+    def setUp(self) -> None:
+        cache.clear()
+
+    @patch(MODULE_PATH + ".fetch_esi_status_cached", lambda: EsiStatus(True, 99, 60))
     def test_should_do_nothing_if_esi_is_ok(self):
         # given
         task = Mock()
@@ -357,7 +1005,7 @@ class TestRetryTaskIfEsiIsDown(TestCase):
         # then
         self.assertFalse(task.retry.called)
 
-    @patch(MODULE_PATH + ".fetch_esi_status", lambda: EsiStatus(False, 99, 60))
+    @patch(MODULE_PATH + ".fetch_esi_status_cached", lambda: EsiStatus(False, 99, 60))
     def test_should_retry_when_esi_is_offline(self):
         # given
         task = Mock()
@@ -370,7 +1018,46 @@ class TestRetryTaskIfEsiIsDown(TestCase):
         _, kwargs = task.retry.call_args
         self.assertTrue(kwargs["countdown"])
 
-    @patch(MODULE_PATH + ".fetch_esi_status", lambda: EsiStatus(True, 1, 60))
+    @patch(MODULE_PATH + ".APPUTILS_ESI_RETRY_RELEASE_RATE", 5)
+    @patch(MODULE_PATH + ".APPUTILS_ESI_RETRY_RAMP_DURATION", 0)
+    @patch(MODULE_PATH + ".APPUTILS_ESI_OFFLINE_RETRY_DELAY", 600)
+    @patch(MODULE_PATH + ".now", lambda: dt.datetime(2021, 6, 29, 10, 0))
+    @patch(MODULE_PATH + ".fetch_esi_status_cached", lambda: EsiStatus(False))
+    def test_should_spread_retries_when_esi_is_offline(self):
+        # given
+        task = Mock()
+        task.retry.side_effect = CeleryRetry()
+        # when
+        countdowns = []
+        for _ in range(3):
+            with self.assertRaises(CeleryRetry):
+                retry_task_if_esi_is_down(task)
+            _, kwargs = task.retry.call_args
+            countdowns.append(kwargs["countdown"])
+        # then
+        self.assertAlmostEqual(countdowns[0], 600.1, delta=0.2)
+        self.assertAlmostEqual(countdowns[1], 600.3, delta=0.2)
+        self.assertAlmostEqual(countdowns[2], 600.5, delta=0.2)
+
+    @patch(MODULE_PATH + ".APPUTILS_ESI_RETRY_RELEASE_RATE", 5)
+    @patch(MODULE_PATH + ".APPUTILS_ESI_RETRY_RAMP_DURATION", 0)
+    @patch(MODULE_PATH + ".APPUTILS_ESI_DAILY_DOWNTIME_START", 11.0)
+    @patch(MODULE_PATH + ".APPUTILS_ESI_DAILY_DOWNTIME_END", 11.25)
+    @patch(MODULE_PATH + ".fetch_esi_status_cached", lambda: EsiStatus(False))
+    def test_should_retry_after_daily_downtime(self):
+        # given
+        task = Mock()
+        task.retry.side_effect = CeleryRetry()
+        # when
+        with patch(MODULE_PATH + ".now") as mock_now:
+            mock_now.return_value = dt.datetime(2021, 6, 29, 11, 5)
+            with self.assertRaises(CeleryRetry):
+                retry_task_if_esi_is_down(task)
+        # then
+        _, kwargs = task.retry.call_args
+        self.assertAlmostEqual(kwargs["countdown"], 600.1, delta=1.0)
+
+    @patch(MODULE_PATH + ".fetch_esi_status_cached", lambda: EsiStatus(True, 1, 60))
     def test_should_retry_if_esi_error_threshold_exceeded(self):
         # given
         task = Mock()
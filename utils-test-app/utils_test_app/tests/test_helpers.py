@@ -1,10 +1,100 @@
 from time import time
+from unittest import skipUnless
 from unittest.mock import patch
 
 from django.core.cache import cache
 from django.test import TestCase
 
-from app_utils.helpers import humanize_number, throttle
+from app_utils.helpers import (
+    chunked_queryset,
+    chunks,
+    humanize_number,
+    humanize_numbers,
+    throttle,
+)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from ..models import Category
+
+
+class TestChunks(TestCase):
+    def test_should_chunk_list(self):
+        # when
+        result = list(chunks([1, 2, 3, 4, 5], 2))
+        # then
+        self.assertEqual(result, [[1, 2], [3, 4], [5]])
+
+    def test_should_chunk_generator(self):
+        # given
+        numbers = (x for x in range(5))
+        # when
+        result = list(chunks(numbers, 2))
+        # then
+        self.assertEqual(result, [[0, 1], [2, 3], [4]])
+
+    def test_should_chunk_set(self):
+        # when
+        result = list(chunks({1, 2, 3}, 2))
+        # then
+        self.assertEqual(len(result), 2)
+        self.assertEqual(set(result[0]) | set(result[1]), {1, 2, 3})
+
+    def test_should_consume_iterator_lazily(self):
+        # given
+        iterator = iter(range(10))
+        # when
+        chunk = next(chunks(iterator, 3))
+        # then
+        self.assertEqual(chunk, [0, 1, 2])
+        self.assertEqual(next(iterator), 3)
+
+    def test_should_return_nothing_for_empty_iterable(self):
+        # when
+        result = list(chunks(iter([]), 2))
+        # then
+        self.assertEqual(result, [])
+
+
+class TestChunkedQueryset(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.categories = [Category.objects.create(name=f"c{i}") for i in range(5)]
+
+    def test_should_return_all_objects_in_chunks(self):
+        # when
+        with self.assertNumQueries(3):
+            result = list(chunked_queryset(Category.objects.all(), 2))
+        # then
+        self.assertEqual(
+            result,
+            [self.categories[0:2], self.categories[2:4], self.categories[4:5]],
+        )
+
+    def test_should_keep_filters_of_queryset(self):
+        # given
+        queryset = Category.objects.filter(pk__lte=self.categories[3].pk)
+        # when
+        result = list(chunked_queryset(queryset, 2))
+        # then
+        self.assertEqual(result, [self.categories[0:2], self.categories[2:4]])
+
+    def test_should_page_by_primary_key(self):
+        # when
+        with self.assertNumQueries(2) as context:
+            list(chunked_queryset(Category.objects.order_by("-name"), 3))
+        # then
+        self.assertIn(">", context.captured_queries[1]["sql"])
+        self.assertNotIn("OFFSET", context.captured_queries[1]["sql"])
+
+    def test_should_return_nothing_for_empty_queryset(self):
+        # when
+        result = list(chunked_queryset(Category.objects.none(), 2))
+        # then
+        self.assertEqual(result, [])
 
 
 class TestFormatisk(TestCase):
@@ -44,6 +134,63 @@ class TestFormatisk(TestCase):
         self.assertEqual(result, "1.235b")
 
 
+class TestHumanizeNumbers(TestCase):
+    VALUES = [
+        0,
+        -1500,
+        999.99,
+        1000,
+        1260000000,
+        123456789,
+        "1234567890",
+        10 ** 15,
+        float("nan"),
+        float("inf"),
+    ]
+
+    def test_should_return_same_as_humanize_number(self):
+        # when
+        result = humanize_numbers(self.VALUES)
+        # then
+        self.assertEqual(result, [humanize_number(value) for value in self.VALUES])
+
+    def test_should_use_custom_magnitude_and_precision(self):
+        # when
+        result = humanize_numbers(self.VALUES, "m", precision=3)
+        # then
+        expected = [humanize_number(value, "m", 3) for value in self.VALUES]
+        self.assertEqual(result, expected)
+
+    def test_should_accept_generators(self):
+        # when
+        result = humanize_numbers(value for value in [1234, 1260000000])
+        # then
+        self.assertEqual(result, ["1.2k", "1.3b"])
+
+    def test_should_raise_value_error_when_type_invalid(self):
+        # when/then
+        with self.assertRaises(ValueError):
+            humanize_numbers([1, "invalid"])
+
+    @skipUnless(numpy, "numpy not installed")
+    def test_should_return_same_as_humanize_number_for_numpy_arrays(self):
+        # given
+        values = numpy.array([float(value) for value in self.VALUES])
+        # when
+        result = humanize_numbers(values)
+        # then
+        self.assertEqual(result, [humanize_number(value) for value in self.VALUES])
+
+    @skipUnless(numpy, "numpy not installed")
+    def test_should_use_custom_magnitude_for_numpy_arrays(self):
+        # given
+        values = numpy.array([1234, 1260000000])
+        # when
+        result = humanize_numbers(values, "k", precision=0)
+        # then
+        self.assertEqual(result, ["1k", "1,260,000k"])
+
+
 def my_func():
     """Dummy function for testing throttle()"""
     return "dummy"
@@ -78,3 +225,44 @@ class TestThrottle(TestCase):
         throttle(my_func, "test-2", timeout=60)
         # then
         self.assertEqual(spy_my_func.call_count, 2)
+
+    def test_should_return_cached_result_for_repeated_calls(self, spy_my_func):
+        # given
+        throttle(my_func, "test-1", timeout=60)
+        # when
+        result = throttle(my_func, "test-1", timeout=60)
+        # then
+        self.assertEqual(spy_my_func.call_count, 1)
+        self.assertEqual(result, "dummy")
+
+    def test_should_not_run_while_other_process_claimed_slot(self, spy_my_func):
+        # given
+        with patch("app_utils.helpers.cache.add", return_value=False):
+            # when
+            result = throttle(my_func, "test-1", timeout=60)
+        # then
+        self.assertEqual(spy_my_func.call_count, 0)
+        self.assertIsNone(result)
+
+    def test_should_use_lock_timeout_for_repeated_calls(self, spy_my_func):
+        # given
+        with patch("app_utils.helpers.cache.add", wraps=cache.add) as spy_add:
+            throttle(my_func, "test-1", timeout=60, lock_timeout=1)
+        lock_key, _, lock_timeout = spy_add.call_args[0]
+        # when
+        cache.delete(lock_key)  # lock has expired
+        throttle(my_func, "test-1", timeout=60, lock_timeout=1)
+        # then
+        self.assertEqual(lock_timeout, 1)
+        self.assertEqual(spy_my_func.call_count, 2)
+
+    def test_should_release_slot_when_func_fails(self, spy_my_func):
+        # given
+        spy_my_func.side_effect = [RuntimeError, "dummy"]
+        with self.assertRaises(RuntimeError):
+            throttle(my_func, "test-1", timeout=60)
+        # when
+        result = throttle(my_func, "test-1", timeout=60)
+        # then
+        self.assertEqual(spy_my_func.call_count, 2)
+        self.assertEqual(result, "dummy")
@@ -0,0 +1,209 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from app_utils import metrics
+from app_utils.caching import cached_queryset
+from app_utils.helpers import throttle
+from app_utils.metrics import InMemorySink, StatsdSink
+
+from ..models import Category, CategoryManager, Item
+
+MODULE_PATH = "app_utils.metrics"
+
+
+class TestInMemorySink(TestCase):
+    def test_should_count(self):
+        # given
+        sink = InMemorySink()
+        # when
+        sink.incr("alpha")
+        sink.incr("alpha", 2)
+        sink.incr("bravo")
+        # then
+        self.assertDictEqual(sink.counters(), {"alpha": 3, "bravo": 1})
+
+    def test_should_collect_timings_in_histogram(self):
+        # given
+        sink = InMemorySink(buckets=(0.01, 0.1))
+        # when
+        sink.timing("alpha", 0.005)
+        sink.timing("alpha", 0.05)
+        sink.timing("alpha", 0.07)
+        sink.timing("alpha", 5)
+        # then
+        timing = sink.timings()["alpha"]
+        self.assertEqual(timing["count"], 4)
+        self.assertAlmostEqual(timing["sum"], 5.125)
+        self.assertDictEqual(timing["buckets"], {0.01: 1, 0.1: 2, float("inf"): 1})
+
+    def test_should_clear_metrics(self):
+        # given
+        sink = InMemorySink()
+        sink.incr("alpha")
+        sink.timing("bravo", 1)
+        # when
+        sink.clear()
+        # then
+        self.assertDictEqual(sink.counters(), {})
+        self.assertDictEqual(sink.timings(), {})
+
+
+class TestStatsdSink(TestCase):
+    def test_should_send_counter(self):
+        # given
+        sink = StatsdSink(host="statsd", port=8125, prefix="test")
+        with patch.object(sink, "_socket") as mock_socket:
+            # when
+            sink.incr("alpha", 2)
+        # then
+        mock_socket.sendto.assert_called_once_with(b"test.alpha:2|c", ("statsd", 8125))
+
+    def test_should_send_timing(self):
+        # given
+        sink = StatsdSink(host="statsd", port=8125, prefix="test")
+        with patch.object(sink, "_socket") as mock_socket:
+            # when
+            sink.timing("alpha", 0.25)
+        # then
+        mock_socket.sendto.assert_called_once_with(
+            b"test.alpha:250.000|ms", ("statsd", 8125)
+        )
+
+    def test_should_ignore_network_errors(self):
+        # given
+        sink = StatsdSink(host="statsd", port=8125, prefix="test")
+        with patch.object(sink, "_socket") as mock_socket:
+            mock_socket.sendto.side_effect = OSError
+            # when/then
+            sink.incr("alpha")
+
+
+def my_func():
+    return "dummy"
+
+
+class TestMetricsForCaching(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.item_1 = Item.objects.create(name="Apple")
+        cls.item_2 = Item.objects.create(name="Banana")
+        cls.category = Category.objects.create(name="Fruits")
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.sink = InMemorySink()
+        metrics.set_metrics_sink(self.sink)
+
+    def tearDown(self) -> None:
+        metrics.set_metrics_sink(None)
+
+    def test_should_record_metrics_for_get_cached(self):
+        # when
+        Item.objects.get_cached(pk=self.item_1.pk)
+        Item.objects.get_cached(pk=self.item_1.pk)
+        # then
+        self.assertDictEqual(
+            self.sink.counters(),
+            {
+                "object.utils_test_app.item.misses": 1,
+                "object.utils_test_app.item.sets": 1,
+                "object.utils_test_app.item.hits": 1,
+            },
+        )
+        timing = self.sink.timings()["object.utils_test_app.item.recompute"]
+        self.assertEqual(timing["count"], 1)
+
+    def test_should_record_metrics_for_get_many_cached(self):
+        # given
+        Item.objects.get_cached(pk=self.item_1.pk)
+        self.sink.clear()
+        # when
+        Item.objects.get_many_cached(pks=[self.item_1.pk, self.item_2.pk, 999])
+        # then
+        self.assertDictEqual(
+            self.sink.counters(),
+            {
+                "object.utils_test_app.item.misses": 2,
+                "object.utils_test_app.item.sets": 1,
+                "object.utils_test_app.item.hits": 1,
+            },
+        )
+        self.assertIn("object.utils_test_app.item.recompute", self.sink.timings())
+
+    def test_should_record_metrics_for_cached_queryset(self):
+        # when
+        cached_queryset(Item.objects.all(), key="my_key", timeout=60, mode="pks")
+        cached_queryset(Item.objects.all(), key="my_key", timeout=60, mode="pks")
+        # then
+        self.assertDictEqual(
+            self.sink.counters(),
+            {
+                "queryset.utils_test_app.item.misses": 1,
+                "queryset.utils_test_app.item.sets": 1,
+                "queryset.utils_test_app.item.hits": 1,
+            },
+        )
+
+    def test_should_record_metrics_for_throttle(self):
+        # when
+        throttle(my_func, "test-1", timeout=60)
+        throttle(my_func, "test-1", timeout=60)
+        # then
+        self.assertDictEqual(
+            self.sink.counters(),
+            {"throttle.misses": 1, "throttle.sets": 1, "throttle.hits": 1},
+        )
+
+    def test_should_not_record_anything_when_disabled(self):
+        # given
+        metrics.set_metrics_sink(None)
+        # when
+        Item.objects.get_cached(pk=self.item_1.pk)
+        Item.objects.get_many_cached(pks=[self.item_2.pk])
+        throttle(my_func, "test-1", timeout=60)
+        # then
+        self.assertDictEqual(self.sink.counters(), {})
+
+    def test_should_record_hits_from_local_cache(self):
+        # given
+        Category.objects.local_cache.clear()
+        Category.objects.get_cached(pk=self.category.pk)
+        self.sink.clear()
+        # when
+        Category.objects.get_cached(pk=self.category.pk)
+        # then
+        self.assertDictEqual(
+            self.sink.counters(), {"object.utils_test_app.category.hits": 1}
+        )
+
+    def test_should_not_create_metric_names_for_local_hits_when_disabled(self):
+        # given
+        metrics.set_metrics_sink(None)
+        Category.objects.local_cache.clear()
+        Category.objects.get_cached(pk=self.category.pk)
+        # when
+        with patch.object(
+            CategoryManager, "_metrics_name", side_effect=RuntimeError
+        ) as mock_metrics_name:
+            Category.objects.get_cached(pk=self.category.pk)
+        # then
+        self.assertFalse(mock_metrics_name.called)
+
+
+class TestCreateSinkFromSetting(TestCase):
+    @patch(MODULE_PATH + ".APP_UTILS_METRICS_SINK", "app_utils.metrics.LoggingSink")
+    def test_should_create_sink(self):
+        # when
+        sink = metrics._create_sink_from_setting()
+        # then
+        self.assertIsInstance(sink, metrics.LoggingSink)
+
+    @patch(MODULE_PATH + ".APP_UTILS_METRICS_SINK", "")
+    def test_should_return_none_when_not_configured(self):
+        self.assertIsNone(metrics._create_sink_from_setting())
+
+    @patch(MODULE_PATH + ".APP_UTILS_METRICS_SINK", "app_utils.metrics.Invalid")
+    def test_should_return_none_when_invalid(self):
+        self.assertIsNone(metrics._create_sink_from_setting())
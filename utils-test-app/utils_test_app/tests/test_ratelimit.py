@@ -0,0 +1,269 @@
+import threading
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from app_utils.ratelimit import (
+    RateLimitExceeded,
+    SlidingWindowRateLimiter,
+    TokenBucketRateLimiter,
+)
+
+MODULE_PATH = "app_utils.ratelimit"
+
+
+@patch(MODULE_PATH + ".time")
+class TestSlidingWindowRateLimiter(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_allow_calls_up_to_limit(self, mock_time):
+        # given
+        mock_time.return_value = 1000.0
+        limiter = SlidingWindowRateLimiter("test", limit=3, period=10)
+        # when
+        results = [limiter.try_acquire() for _ in range(4)]
+        # then
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_should_limit_per_key(self, mock_time):
+        # given
+        mock_time.return_value = 1000.0
+        limiter = SlidingWindowRateLimiter("test", limit=1, period=10)
+        # when/then
+        self.assertTrue(limiter.try_acquire("a"))
+        self.assertTrue(limiter.try_acquire("b"))
+        self.assertFalse(limiter.try_acquire("a"))
+
+    def test_should_weight_previous_window(self, mock_time):
+        # given
+        limiter = SlidingWindowRateLimiter("test", limit=4, period=10)
+        mock_time.return_value = 1000.0
+        for _ in range(4):
+            limiter.try_acquire()
+        # when
+        mock_time.return_value = 1015.0  # half of previous window counts
+        results = [limiter.try_acquire() for _ in range(3)]
+        # then
+        self.assertEqual(results, [True, True, False])
+
+    def test_should_not_count_rejected_calls(self, mock_time):
+        # given
+        mock_time.return_value = 1000.0
+        limiter = SlidingWindowRateLimiter("test", limit=2, period=10)
+        limiter.try_acquire()
+        limiter.try_acquire()
+        limiter.try_acquire()
+        # when
+        mock_time.return_value = 1010.0
+        result = limiter.try_acquire()
+        # then
+        self.assertFalse(result)
+        mock_time.return_value = 1015.0
+        self.assertTrue(limiter.try_acquire())
+
+    def test_should_raise_with_retry_in(self, mock_time):
+        # given
+        mock_time.return_value = 1002.0
+        limiter = SlidingWindowRateLimiter("test", limit=1, period=10)
+        limiter.acquire()
+        # when
+        with self.assertRaises(RateLimitExceeded) as cm:
+            limiter.acquire()
+        # then
+        self.assertAlmostEqual(cm.exception.retry_in, 8)
+
+
+@patch(MODULE_PATH + ".time")
+class TestTokenBucketRateLimiter(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_allow_burst_up_to_limit(self, mock_time):
+        # given
+        mock_time.return_value = 1000.0
+        limiter = TokenBucketRateLimiter("test", limit=3, period=3)
+        # when
+        results = [limiter.try_acquire() for _ in range(4)]
+        # then
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_should_refill_tokens_over_time(self, mock_time):
+        # given
+        mock_time.return_value = 1000.0
+        limiter = TokenBucketRateLimiter("test", limit=3, period=3)
+        for _ in range(3):
+            limiter.try_acquire()
+        # when
+        mock_time.return_value = 1001.0
+        results = [limiter.try_acquire() for _ in range(2)]
+        # then
+        self.assertEqual(results, [True, False])
+
+    def test_should_not_hold_more_tokens_than_limit(self, mock_time):
+        # given
+        mock_time.return_value = 1000.0
+        limiter = TokenBucketRateLimiter("test", limit=3, period=3)
+        limiter.try_acquire()
+        # when
+        mock_time.return_value = 1100.0
+        results = [limiter.try_acquire() for _ in range(4)]
+        # then
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_should_carry_state_into_next_epoch(self, mock_time):
+        # given
+        limiter = TokenBucketRateLimiter("test", limit=3, period=30)
+        epoch_end = 30.0 * TokenBucketRateLimiter.EPOCH_PERIODS * 4
+        mock_time.return_value = epoch_end - 0.5
+        for _ in range(3):
+            limiter.try_acquire()
+        # when
+        mock_time.return_value = epoch_end  # one token refilled
+        results = [limiter.try_acquire() for _ in range(2)]
+        # then
+        self.assertEqual(results, [True, False])
+
+    def test_should_raise_with_retry_in(self, mock_time):
+        # given
+        mock_time.return_value = 1000.0
+        limiter = TokenBucketRateLimiter("test", limit=2, period=10)
+        limiter.acquire(count=2)
+        # when
+        with self.assertRaises(RateLimitExceeded) as cm:
+            limiter.acquire()
+        # then
+        self.assertAlmostEqual(cm.exception.retry_in, 5)
+
+
+class CacheWithHook:
+    """Wraps the cache and calls a hook once before the n-th call of incr or decr."""
+
+    def __init__(self, nth_call: int, hook) -> None:
+        self._nth_call = nth_call
+        self._hook = hook
+        self._calls = 0
+
+    def incr(self, *args, **kwargs):
+        self._before_call()
+        return cache.incr(*args, **kwargs)
+
+    def decr(self, *args, **kwargs):
+        self._before_call()
+        return cache.decr(*args, **kwargs)
+
+    def _before_call(self):
+        self._calls += 1
+        if self._calls == self._nth_call:
+            self._hook()
+
+    def __getattr__(self, name):
+        return getattr(cache, name)
+
+
+class CacheWithBarrier:
+    """Wraps the cache and lets each thread wait at a barrier after its first incr."""
+
+    def __init__(self, barrier: threading.Barrier) -> None:
+        self._barrier = barrier
+        self._local = threading.local()
+
+    def incr(self, *args, **kwargs):
+        result = cache.incr(*args, **kwargs)
+        if not getattr(self._local, "has_waited", False):
+            self._local.has_waited = True
+            self._barrier.wait()
+        return result
+
+    def __getattr__(self, name):
+        return getattr(cache, name)
+
+
+@patch(MODULE_PATH + ".time")
+class TestTokenBucketRateLimiterConcurrency(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def _make_idle_limiter(self, mock_time):
+        limiter = TokenBucketRateLimiter("test", limit=10, period=1)
+        mock_time.return_value = 1000.0
+        limiter.try_acquire()
+        mock_time.return_value = 1050.0
+        return limiter
+
+    def test_should_not_block_when_catch_ups_interleave(self, mock_time):
+        # given
+        limiter = self._make_idle_limiter(mock_time)
+        results = []
+        # when other call runs between incr of the call and incr of its catch up
+        with patch(
+            MODULE_PATH + ".cache",
+            CacheWithHook(2, lambda: results.append(limiter.try_acquire())),
+        ):
+            results.append(limiter.try_acquire())
+        # then
+        self.assertEqual(results, [True, True])
+        mock_time.return_value = 1051.0
+        results = [limiter.try_acquire() for _ in range(11)]
+        self.assertEqual(results, [True] * 10 + [False])
+
+    def test_should_not_block_when_threads_catch_up_at_same_time(self, mock_time):
+        # given
+        limiter = self._make_idle_limiter(mock_time)
+        barrier = threading.Barrier(2, timeout=5)
+        results = []
+
+        def call_limiter():
+            results.append(limiter.try_acquire())
+
+        # when both threads have taken their token before any catches up
+        with patch(MODULE_PATH + ".cache", CacheWithBarrier(barrier)):
+            threads = [threading.Thread(target=call_limiter) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        # then
+        self.assertEqual(results, [True, True])
+        mock_time.return_value = 1051.0
+        results = [limiter.try_acquire() for _ in range(11)]
+        self.assertEqual(results, [True] * 10 + [False])
+
+
+class TestRateLimiterDecorator(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_should_limit_calls_per_key(self):
+        # given
+        limiter = SlidingWindowRateLimiter("test", limit=1, period=60)
+
+        @limiter.limited(key=lambda user_id, message: user_id)
+        def notify(user_id, message):
+            return message
+
+        # when/then
+        self.assertEqual(notify(1, "hello"), "hello")
+        self.assertEqual(notify(2, "hello"), "hello")
+        with self.assertRaises(RateLimitExceeded):
+            notify(1, "hello")
+
+    def test_should_limit_all_calls_without_key(self):
+        # given
+        limiter = TokenBucketRateLimiter("test", limit=1, period=60)
+
+        @limiter.limited()
+        def my_func():
+            return "dummy"
+
+        # when/then
+        self.assertEqual(my_func(), "dummy")
+        with self.assertRaises(RateLimitExceeded):
+            my_func()
+
+    def test_should_reject_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            SlidingWindowRateLimiter("test", limit=0, period=60)
+        with self.assertRaises(ValueError):
+            TokenBucketRateLimiter("test", limit=1, period=0)
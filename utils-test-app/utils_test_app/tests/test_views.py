@@ -7,6 +7,7 @@ from app_utils.views import (
     bootstrap_label_html,
     bootstrap_link_button_html,
     humanize_value,
+    humanize_values,
     link_html,
     no_wrap_html,
     yesno_str,
@@ -100,3 +101,19 @@ class TestFormatIskValue(TestCase):
 
     def test_precision(self):
         self.assertEqual(humanize_value(12340000000, 1), "12.3b")
+
+
+class TestHumanizeValues(TestCase):
+    def test_should_return_same_as_humanize_value(self):
+        # given
+        values = [0.9, 1, 1100, 551100, 1000000, 1000000000, 1000000000000, -5000]
+        # when
+        result = humanize_values(values)
+        # then
+        self.assertEqual(result, [humanize_value(value) for value in values])
+
+    def test_should_format_with_custom_precision(self):
+        # when
+        result = humanize_values([12340000000, 0.25], 1)
+        # then
+        self.assertEqual(result, ["12.3b", "0.2"])